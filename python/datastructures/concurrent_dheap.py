@@ -0,0 +1,203 @@
+import asyncio
+import threading
+from typing import Any, Optional
+
+from datastructures.dheap import DHeap
+
+
+class ConcurrentDHeap:
+    """
+    A thread-safe priority queue built on DHeap. Every operation takes a lock, get blocks until there is an element
+    (or until the timeout expires) and put_many inserts a whole batch taking the lock only once.
+    The extraction order is the same of the underlying heap (max or min priority first).
+    """
+
+    def __init__(self, heap: Optional[DHeap] = None, maxsize: int = 0):
+        """
+        Args:
+            heap(optional): the heap to protect; by default an empty DHeap() is created. The heap should not be used directly
+                after it's passed here.
+            maxsize(optional): maximum number of elements; if > 0, put and put_many block while the queue is full.
+        """
+
+        self._heap = heap if heap is not None else DHeap()
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+
+    def put(self, element: Any, priority: int, timeout: Optional[float] = None) -> None:
+        """
+        Insert an element with an associated priority, waiting for a free slot if the queue is bounded and full.
+        Running time: O(log(N) in base branching factor) plus the waiting time.
+
+        Args:
+            element: element to insert.
+            priority: priority associated.
+            timeout(optional): maximum number of seconds to wait (None means forever).
+        """
+        self.put_many([element], [priority], timeout)
+
+
+    def put_many(self, elements: list[Any], priorities: list[int], timeout: Optional[float] = None) -> None:
+        """
+        Insert a batch of elements with DHeap.insert_many, taking the lock once. If the queue is bounded, wait until there
+        is room for the whole batch.
+        Running time: the same of DHeap.insert_many plus the waiting time.
+
+        Args:
+            elements: list of elements to insert.
+            priorities: list of priorities. Note that priorities[i] should correspond to the priority of elements[i].
+            timeout(optional): maximum number of seconds to wait (None means forever).
+        """
+
+        if self.maxsize > 0 and len(elements) > self.maxsize:
+            raise ValueError("The batch is bigger than the maximum size of the queue.")
+
+        with self._not_full:
+            if self.maxsize > 0:
+                has_room = lambda: len(self._heap) + len(elements) <= self.maxsize
+                if not self._not_full.wait_for(has_room, timeout):
+                    raise TimeoutError("The queue is full.")
+
+            self._heap.insert_many(elements, priorities)
+            #Wake up every consumer: notify(n) could wake a consumer of a large batch while another one is left waiting; 
+            #wait_for checks the condition again anyway.
+            self._not_empty.notify_all()
+
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Extract the element at the root of the heap, waiting for an element if the queue is empty.
+        Running time: O(log(N) in base branching factor) plus the waiting time.
+
+        Args:
+            timeout(optional): maximum number of seconds to wait (None means forever).
+        Return:
+            the extracted element or raise TimeoutError if the timeout expires.
+        """
+        return self.get_many(1, timeout)[0]
+
+
+    def get_many(self, k: int, timeout: Optional[float] = None) -> list[Any]:
+        """
+        Extract up to k elements with DHeap.pop_many, taking the lock once. Wait only if the queue is empty.
+        Running time: the same of DHeap.pop_many plus the waiting time.
+
+        Args:
+            k: maximum number of elements to extract.
+            timeout(optional): maximum number of seconds to wait (None means forever).
+        Return:
+            the list of the extracted elements, ordered by priority, or raise TimeoutError if the timeout expires.
+        """
+
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: not self._heap.empty(), timeout):
+                raise TimeoutError("The queue is empty.")
+
+            elements = self._heap.pop_many(k)
+            #The producers wait for room for batches of different sizes: notify(n) could wake only producers whose batch
+            #still doesn't fit and lose the notification, so wake them all.
+            self._not_full.notify_all()
+            return elements
+
+
+    def update(self, element: Any, new_priority: int) -> None:
+        """
+        Update the priority of an element (see DHeap.update).
+        """
+        with self._lock:
+            self._heap.update(element, new_priority)
+
+
+    def remove(self, element: Any) -> None:
+        """
+        Remove the given element (see DHeap.remove).
+        """
+        with self._lock:
+            self._heap.remove(element)
+            self._not_full.notify_all()
+
+
+    def contains(self, element: Any) -> bool:
+        with self._lock:
+            return self._heap.contains(element)
+
+
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+
+
+class AsyncDHeap:
+    """
+    A priority queue for asyncio tasks built on DHeap: get can be awaited until an element is available.
+    The queue is unbounded, so put and put_many never wait; they are coroutines only because they need the condition lock
+    to wake up the waiting consumers. As every asyncio object, it must be used by the tasks of a single event loop.
+    """
+
+    def __init__(self, heap: Optional[DHeap] = None):
+        """
+        Args:
+            heap(optional): the heap to use; by default an empty DHeap() is created.
+        """
+
+        self._heap = heap if heap is not None else DHeap()
+        self._not_empty = asyncio.Condition()
+
+
+    async def put(self, element: Any, priority: int) -> None:
+        """
+        Insert an element with an associated priority and wake up a waiting consumer.
+        Running time: O(log(N) in base branching factor).
+        """
+        await self.put_many([element], [priority])
+
+
+    async def put_many(self, elements: list[Any], priorities: list[int]) -> None:
+        """
+        Insert a batch of elements with DHeap.insert_many and wake up the waiting consumers.
+        Running time: the same of DHeap.insert_many.
+        """
+        async with self._not_empty:
+            self._heap.insert_many(elements, priorities)
+            #See ConcurrentDHeap.put_many.
+            self._not_empty.notify_all()
+
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Extract the element at the root of the heap, waiting for an element if the queue is empty.
+        Running time: O(log(N) in base branching factor) plus the waiting time.
+
+        Args:
+            timeout(optional): maximum number of seconds to wait (None means forever).
+        Return:
+            the extracted element or raise TimeoutError if the timeout expires.
+        """
+        return (await self.get_many(1, timeout))[0]
+
+
+    async def get_many(self, k: int, timeout: Optional[float] = None) -> list[Any]:
+        """
+        Extract up to k elements with DHeap.pop_many. Wait only if the queue is empty.
+        Running time: the same of DHeap.pop_many plus the waiting time.
+        """
+        async with self._not_empty:
+            try:
+                await asyncio.wait_for(self._not_empty.wait_for(lambda: not self._heap.empty()), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError("The queue is empty.")
+            return self._heap.pop_many(k)
+
+
+    def empty(self) -> bool:
+        return self._heap.empty()
+
+    def __len__(self):
+        return len(self._heap)
@@ -1,41 +1,166 @@
-from typing import Any, Callable
+import math
+import numbers
+import operator
+import sys
+from array import array
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Iterable, Optional, Union
 
 
 #For the moment, i treat every element as a tuple (element, priority). However i think that, because the class manipulate only the 
 #priorities, a better implementation could be to divide into 2 arrays the elements and the priorities and work only with the last for 
 #the actual move around.
-#TODO: run test to examine this theory.
+#ArrayDHeap (at the end of this file) implements this idea; profile/heap_profile.py runs both the classes to compare them.
 #TODO: think if it's better to raise an exception or return a boolean in: update, remove.
 
+
+def _prefer_heapify(heap_size: int, batch_size: int, branching_factor: int) -> bool:
+    """
+    Decide how to add a batch of elements to an heap.
+    Rebuilding the whole heap bottom-up costs O(N + M), while M bubble up cost O(M * log(N + M)) in the worst case; 
+    return true if the rebuild is cheaper. With a branching factor of 1 the heap is a list and the log is not defined: 
+    the batch is always inserted one at the time.
+    """
+    total = heap_size + batch_size
+    if batch_size == 0 or total < 2 or branching_factor < 2:
+        return False
+    return batch_size * math.log(total, branching_factor) > total
+
+
+def _prefer_rebuild(heap_size: int, k: int, branching_factor: int) -> bool:
+    """
+    Decide how to extract the first k elements of an heap.
+    k calls to top cost O(k * D * log(N)), while finding the first k positions with a frontier heap and rebuilding the remaining
+    elements costs O(N + k * D * log(k)); return true if the rebuild is cheaper (never with a branching factor of 1).
+    """
+    if k < 2 or heap_size < 2 or branching_factor < 2:
+        return False
+    return k * branching_factor * math.log(heap_size, branching_factor) > heap_size
+
+
+class _PriorityKey:
+    """
+    Wrapper of a priority for heaps built with a custom comparator: x < y if comparator(x.priority, y.priority) is true,
+    so the sift routines can use the operator < also in this case.
+    """
+    __slots__ = ("priority", "comparator")
+
+    def __init__(self, priority: Any, comparator: Callable[[Any, Any], bool]):
+        self.priority = priority
+        self.comparator = comparator
+
+    def __lt__(self, other: "_PriorityKey") -> bool:
+        return self.comparator(self.priority, other.priority)
+
+    def __eq__(self, other: "_PriorityKey") -> bool:
+        #Equal means that neither priority is higher, so a tuple (key, sequence number) compares the sequence numbers.
+        return not self.comparator(self.priority, other.priority) and not self.comparator(other.priority, self.priority)
+
+
+def _max_key(priority: Any) -> Any:
+    """
+    Key of a priority in a 'max' heap: the negated priority for a number, so the sift routines compare plain numbers, and a
+    _PriorityKey with the reversed comparison for any other comparable priority (for example a tuple).
+    """
+    if type(priority) is int or type(priority) is float or isinstance(priority, numbers.Real):
+        return -priority
+    return _PriorityKey(priority, operator.gt)
+
+
+@dataclass
+class DHeapStats:
+    """
+    Counters of the operations executed on a DHeap and of the levels crossed by the sift routines (bubble up and push down).
+    relayouts counts how many times an auto tuned heap changed its branching factor.
+    """
+    inserts: int = 0
+    tops: int = 0
+    updates: int = 0
+    removes: int = 0
+    bubble_ups: int = 0
+    bubble_up_levels: int = 0
+    push_downs: int = 0
+    push_down_levels: int = 0
+    relayouts: int = 0
+
+
 class DHeap:
     """
     A DHeap data structure. The data structure assume that there are no equals priorities (TODO: support equals priorities (SOLVED)).
-    This implementation doesn't use auxiliary data structure for speed up search (with an hash table for example); if you need to
-    do a lot of search, update priorities or remove elements, this implementation is not good for your case.
+    By default this implementation doesn't use auxiliary data structure for speed up search; if you need to do a lot of search,
+    update priorities or remove elements (for example in Dijkstra or A*), build the heap with indexed=True. In this mode the heap
+    keeps an hash table element -> position, so the elements must be hashable and unique.
+
+    The sift routines compare the priorities only with the operator <, without calling a comparator function: the priorities of 
+    a 'max' heap are stored negated (the priorities that are not numbers are wrapped in _PriorityKey with the reversed comparison)
+    and the priorities of a custom comparator are wrapped in _PriorityKey.
+
+    With stable=True the elements with equal priorities are extracted in insertion order (FIFO): every element gets a sequence
+    number, kept in the array self._order parallel to self._pairs, that is compared only when the priorities are equal. 
+    update doesn't change the sequence number of an element.
+
+    With track_stats=True the heap counts the operations and the sift depths in self.stats; with auto_tune=True it also uses 
+    them to periodically re-layout itself with the branching factor that minimizes the estimated number of comparisons.
     """
 
-    def __init__(self, branching_factor: int = 2, comparator: str = "max", 
-                    elements: list[Any]= None, priorities: list[int] = None):
+    #Branching factors considered by recommend_branching_factor.
+    BranchingFactors = range(2, 21)
+    #Minimum number of operations between two automatic retunes (the interval is at least the size of the heap, so the 
+    #cost of the re-layout is amortized).
+    AutoTuneInterval = 10000
+    #An auto tuned heap changes branching factor only if the estimated cost drops by at least this fraction.
+    AutoTuneMinGain = 0.1
+
+    def __init__(self, branching_factor: int = 2, comparator: Union[str, Callable[[Any, Any], bool]] = "max", 
+                    elements: list[Any]= None, priorities: list[int] = None, indexed: bool = False, 
+                    track_stats: bool = False, auto_tune: bool = False, stable: bool = False):
         """
         Args:
         branching_factor: how many childrens has a parent.
-        comparator: 'max' for max heap and 'min' for min heap.
+        comparator: 'max' for max heap and 'min' for min heap. It can also be a function f(x, y) that returns true if the priority x
+            is "higher" than y; this is slower because there is a function call for every comparison.
         elements(optional): list of elements. Note that elements[i] should correspond to the element associated to the priority priorities[i].
         priorities(optional): list of prioritities. Note that priority[i] should correspond to the prioririty associated to the element elements[i].
+        indexed(optional): if true, keep a map element -> position so that contains is O(1) and update, remove are O(log(N)).
+        track_stats(optional): if true, count the operations and the sift depths in self.stats.
+        auto_tune(optional): if true, track the stats and change the branching factor when the observed workload requires it.
+        stable(optional): if true, the elements with equal priorities are extracted in insertion order.
         """
 
         self.d = branching_factor 
         self.comparator: Callable[[int, int], bool] = None
+        #Transform a priority into the key stored in the heap (None means that the priority is stored as it is).
+        self._key: Optional[Callable[[Any], Any]] = None
         
         if comparator == "max":
             self.comparator = lambda x, y: x > y
+            self._key = _max_key
         elif comparator == "min":
             self.comparator = lambda x, y: x < y
+        elif callable(comparator):
+            self.comparator = comparator
+            self._key = lambda priority: _PriorityKey(priority, comparator)
         else:
-            raise ValueError("The comparator should be 'max' or 'min'.")
+            raise ValueError("The comparator should be 'max', 'min' or a function.")
+        #Two heaps store compatible keys (and can be merged) only if they have the same comparator.
+        self._comparator_kind = comparator
 
 
         self._pairs: list[tuple[Any, int]] = []
+        self._positions: Optional[dict[Any, int]] = {} if indexed else None
+
+        #Insertion sequence numbers of a stable heap: self._order[i] belongs to self._pairs[i].
+        self._order: Optional[array] = None
+        self._counter = 0
+        if stable:
+            self._order = array("q")
+            self.__bubble_up = self.__stable_bubble_up
+            self.__push_down = self.__stable_push_down
+
+        self.stats: Optional[DHeapStats] = DHeapStats() if track_stats or auto_tune else None
+        self._auto_tune = auto_tune
+        #Value of the stats at the last retune, used to consider only the recent workload.
+        self._tune_snapshot = DHeapStats()
 
         if elements is not None and priorities is not None:
             self._heapify(elements, priorities)
@@ -53,9 +178,75 @@ class DHeap:
             priority: priority associated.
         """
         
+        #The key is computed first: if it raises, the heap is not modified.
+        if self._key is not None:
+            priority = self._key(priority)
+
+        if self._positions is not None:
+            if element in self._positions:
+                raise ValueError("The element is already in the heap.")
+            self._positions[element] = len(self)
+
         pair = (element, priority)
         self._pairs.append(pair)
-        self.__bubble_up(len(self) - 1)
+        if self._order is not None:
+            self._order.append(self._counter)
+            self._counter += 1
+        levels = self.__bubble_up(len(self) - 1)
+
+        if self.stats is not None:
+            self.__record("inserts", bubble_up_levels=levels)
+
+
+    def insert_many(self, elements: list[Any], priorities: list[int]) -> None:
+        """
+        Insert a batch of elements with the associated priorities.
+        If the batch is large compared to the heap, the pairs are appended to the heap and the heap is rebuilt bottom-up,
+        otherwise every pair is inserted with a bubble up.
+        Running time: O(min(M * log(N + M), N + M)) where M is the size of the batch.
+
+        Args:
+            elements: list of elements to insert.
+            priorities: list of priorities. Note that priorities[i] should correspond to the priority of elements[i].
+        """
+
+        assert(len(elements) == len(priorities))
+
+        #The keys are computed first: if one raises, the heap is not modified.
+        if self._key is not None:
+            priorities = list(map(self._key, priorities))
+
+        positions = self._positions
+        if positions is not None:
+            batch = set(elements)
+            if len(batch) != len(elements) or not batch.isdisjoint(positions):
+                raise ValueError("The element is already in the heap.")
+
+        if not _prefer_heapify(len(self), len(elements), self.d):
+            for element, priority in zip(elements, priorities):
+                if positions is not None:
+                    positions[element] = len(self)
+                self._pairs.append((element, priority))
+                if self._order is not None:
+                    self._order.append(self._counter)
+                    self._counter += 1
+                levels = self.__bubble_up(len(self) - 1)
+
+                if self.stats is not None:
+                    self.__record("inserts", bubble_up_levels=levels)
+            return
+
+        if positions is not None:
+            for i, element in enumerate(elements, len(self)):
+                positions[element] = i
+        self._pairs.extend(zip(elements, priorities))
+        if self._order is not None:
+            self._order.extend(range(self._counter, self._counter + len(elements)))
+            self._counter += len(elements)
+        sifts = self.__rebuild()
+
+        if self.stats is not None:
+            self.__record_rebuild("inserts", len(elements), *sifts)
 
 
     def top(self) -> Any:
@@ -71,13 +262,24 @@ class DHeap:
             raise IndexError("Empty heap.")
         
         last_leaf = self._pairs.pop()
+        last_seq = self._order.pop() if self._order is not None else 0
         if self.empty():
+            if self._positions is not None:
+                del self._positions[last_leaf[0]]
+            if self.stats is not None:
+                self.__record("tops")
             return last_leaf[0]
 
         root = self._pairs[0]
+        if self._positions is not None:
+            del self._positions[root[0]]
         self._pairs[0] = last_leaf
-        self.__push_down(0)
+        if self._order is not None:
+            self._order[0] = last_seq
+        levels = self.__push_down(0)
 
+        if self.stats is not None:
+            self.__record("tops", push_down_levels=levels)
         return root[0]
 
 
@@ -85,7 +287,7 @@ class DHeap:
         """
         Remove the given element if present. Use this function with caution, because it's slow. (There is a search, possible reallocation
         of the underlying list and a call to function which restores the heap invariants.)
-        Running time: O(n).
+        Running time: O(n), O(log(N) in base branching factor) if the heap is indexed.
 
         Args:
             element: the element to remove.
@@ -97,14 +299,36 @@ class DHeap:
             raise IndexError("The element is not in the heap.")
 
         last_leaf = self._pairs.pop()
+        last_seq = self._order.pop() if self._order is not None else 0
+        if self._positions is not None:
+            del self._positions[element]
+
+        #The removed element was the last leaf, so there is nothing to fix.
+        if idx == len(self):
+            if self.stats is not None:
+                self.__record("removes")
+            return
+
         _, priority = self._pairs[idx]
         self._pairs[idx] = last_leaf
-
+        if self._positions is not None:
+            self._positions[last_leaf[0]] = idx
+
+        push_down = priority < last_leaf[1]
+        if self._order is not None:
+            #With equal priorities, the insertion order decides.
+            seq = self._order[idx]
+            self._order[idx] = last_seq
+            push_down = push_down or (not last_leaf[1] < priority and seq < last_seq)
         
-        if self.comparator(priority, last_leaf[1]):
-            self.__push_down(idx)
+        if push_down:
+            levels = self.__push_down(idx)
+            if self.stats is not None:
+                self.__record("removes", push_down_levels=levels)
         else:
-            self.__bubble_up(idx)
+            levels = self.__bubble_up(idx)
+            if self.stats is not None:
+                self.__record("removes", bubble_up_levels=levels)
 
 
     def peek(self) -> Any:
@@ -120,9 +344,127 @@ class DHeap:
         return self._pairs[0][0]
 
 
+    def pop_many(self, k: int) -> list[Any]:
+        """
+        Extract the k elements with the highest/lowest priority (less if the heap has less than k elements).
+        If k is large compared to the heap, the first k positions are found as in peek_k and the remaining pairs are rebuilt
+        bottom-up, otherwise top is called k times.
+        Running time: O(min(k * D * log(N), N + k * D * log(k))) where D is the branching factor.
+
+        Args:
+            k: number of elements to extract.
+        Return:
+            the list of the extracted elements, ordered by priority.
+        """
+
+        k = min(k, len(self))
+        if not _prefer_rebuild(len(self), k, self.d):
+            return [self.top() for _ in range(k)]
+
+        top_indices = self.__top_k_indices(k)
+        result = [self._pairs[i][0] for i in top_indices]
+
+        taken = set(top_indices)
+        self._pairs = [pair for i, pair in enumerate(self._pairs) if i not in taken]
+        if self._order is not None:
+            self._order = array("q", [seq for i, seq in enumerate(self._order) if i not in taken])
+        if self._positions is not None:
+            self._positions = {pair[0]: i for i, pair in enumerate(self._pairs)}
+        sifts = self.__rebuild()
+
+        if self.stats is not None:
+            self.__record_rebuild("tops", k, *sifts)
+        return result
+
+
+    def peek_k(self, k: int) -> list[Any]:
+        """
+        Return (without extracting them) the k elements with the highest/lowest priority.
+        The heap is not modified: the d-ary tree is visited from the root with an auxiliary frontier heap.
+        Running time: O(k * D * log(k)) where D is the branching factor.
+
+        Args:
+            k: number of elements to return.
+        Return:
+            the list of the first k elements, ordered by priority.
+        """
+
+        return [self._pairs[i][0] for i in self.__top_k_indices(k)]
+
+
+    def merge(self, other: "DHeap") -> None:
+        """
+        Add all the elements of another heap (that is not modified). If the other heap is large compared to this one, its pairs 
+        are appended to the underlying list and the heap is rebuilt bottom-up, otherwise every pair is inserted with a bubble up.
+        The heaps must have the same comparator and a heap can't be merged with itself. For a stable heap, the elements of other 
+        are considered inserted after the elements of this heap; they keep their relative order only if other is stable too,
+        otherwise the elements of other with equal priorities come out in an arbitrary order (as they would from other).
+        Running time: O(min(M * log(N + M), N + M)) where M is the size of the other heap.
+
+        Args:
+            other: the heap to merge into this one.
+        """
+
+        if not isinstance(other, DHeap):
+            raise TypeError("A DHeap can only be merged with another DHeap.")
+
+        if other is self:
+            raise ValueError("A heap can't be merged with itself.")
+
+        if self._comparator_kind != other._comparator_kind:
+            raise ValueError("The heaps must have the same comparator.")
+
+        #If other is not indexed it can contain the same element twice.
+        if self._positions is not None:
+            batch = set(pair[0] for pair in other._pairs)
+            if len(batch) != len(other) or not batch.isdisjoint(self._positions):
+                raise ValueError("The element is already in the heap.")
+
+        #Sequence numbers for the pairs of other, after the ones already used by this heap.
+        other_order = None
+        if self._order is not None and other._order is not None:
+            other_order = [self._counter + seq for seq in other._order]
+            self._counter += other._counter
+        elif self._order is not None:
+            other_order = range(self._counter, self._counter + len(other))
+            self._counter += len(other)
+
+        if not _prefer_heapify(len(self), len(other), self.d):
+            for i, pair in enumerate(other._pairs):
+                if self._positions is not None:
+                    self._positions[pair[0]] = len(self)
+                self._pairs.append(pair)
+                if other_order is not None:
+                    self._order.append(other_order[i])
+                levels = self.__bubble_up(len(self) - 1)
+
+                if self.stats is not None:
+                    self.__record("inserts", bubble_up_levels=levels)
+            return
+
+        if self._positions is not None:
+            for i, pair in enumerate(other._pairs, len(self)):
+                self._positions[pair[0]] = i
+        self._pairs.extend(other._pairs)
+        if other_order is not None:
+            self._order.extend(other_order)
+        sifts = self.__rebuild()
+
+        if self.stats is not None:
+            self.__record_rebuild("inserts", len(other), *sifts)
+
+
+    def __ior__(self, other: "DHeap") -> "DHeap":
+        """
+        heap |= other is the same as heap.merge(other).
+        """
+        self.merge(other)
+        return self
+
+
     def contains(self, element: Any) -> bool:
         """
-        Running time: O(n).
+        Running time: O(n), O(1) if the heap is indexed.
 
         Args:
             element: the element to search.
@@ -135,6 +477,7 @@ class DHeap:
     def update(self, element: Any, new_priority: int) -> None:
         """
         Update the priority of an element.
+        Running time: O(n), O(log(N) in base branching factor) if the heap is indexed.
 
         Args:
             element: an object.
@@ -147,16 +490,93 @@ class DHeap:
             raise IndexError("The element is not in the heap.")
 
 
+        if self._key is not None:
+            new_priority = self._key(new_priority)
         old_priority = self._pairs[element_idx][1]
         self._pairs[element_idx] = (element, new_priority)
 
-        if self.comparator(new_priority, old_priority):
-            self.__bubble_up(element_idx)
+        if new_priority < old_priority:
+            levels = self.__bubble_up(element_idx)
+            if self.stats is not None:
+                self.__record("updates", bubble_up_levels=levels)
         else:
-            self.__push_down(element_idx)
+            levels = self.__push_down(element_idx)
+            if self.stats is not None:
+                self.__record("updates", push_down_levels=levels)
 
 
 
+    def recommend_branching_factor(self) -> int:
+        """
+        Estimate the best branching factor for the workload observed since the last retune (or since the creation of the heap).
+        The cost of a bubble up is one comparison per level, the cost of a push down is D comparisons per level; the observed 
+        number of levels is rescaled to every candidate D' by log(D) / log(D'), since the height of the tree is log(N) in base D.
+        Running time: O(len(BranchingFactors)).
+
+        Return:
+            the branching factor (in DHeap.BranchingFactors) with the lowest estimated cost, or the current one if the heap has
+            no stats or no sift has been observed.
+        """
+
+        if self.stats is None:
+            return self.d
+
+        sifts = self.__observed_sifts()
+        if sifts[0] + sifts[2] == 0:
+            return self.d
+
+        return min(DHeap.BranchingFactors, key=lambda d: self.__estimated_cost(d, *sifts))
+
+
+    def retune(self) -> bool:
+        """
+        Re-layout the heap with the branching factor returned by recommend_branching_factor, if the estimated cost improves by
+        at least AutoTuneMinGain. The heap is rebuilt bottom-up and the observed workload is reset.
+        Running time: O(N) if the branching factor changes.
+
+        Return:
+            True if the branching factor is changed, else False.
+        """
+
+        if self.stats is None:
+            return False
+
+        sifts = self.__observed_sifts()
+        best_d = self.recommend_branching_factor()
+        current_cost = self.__estimated_cost(self.d, *sifts)
+        best_cost = self.__estimated_cost(best_d, *sifts)
+        self._tune_snapshot = replace(self.stats)
+
+        if best_d == self.d or best_cost > current_cost * (1 - DHeap.AutoTuneMinGain):
+            return False
+
+        self.d = best_d
+        self.__rebuild()
+        self.stats.relayouts += 1
+        self._tune_snapshot = replace(self.stats)
+        return True
+
+
+    def memory_usage(self) -> int:
+        """
+        Estimate the memory used by the heap with sys.getsizeof: the underlying list, the tuples, the elements, the priorities
+        and the auxiliary structures. The objects shared by many pairs (for example small ints) are counted for every reference.
+        Running time: O(n).
+
+        Return:
+            the number of bytes.
+        """
+
+        size = sys.getsizeof(self._pairs)
+        for pair in self._pairs:
+            size += sys.getsizeof(pair) + sys.getsizeof(pair[0]) + sys.getsizeof(pair[1])
+        if self._positions is not None:
+            size += sys.getsizeof(self._positions)
+        if self._order is not None:
+            size += sys.getsizeof(self._order)
+        return size
+
+
     def empty(self) -> bool:
         return len(self) == 0
     
@@ -169,7 +589,7 @@ class DHeap:
     def __find(self, element: Any) -> int:
         """
         Find a specific element. 
-        Running time: O(n).
+        Running time: O(n), O(1) if the heap is indexed.
 
         Args:
             element: element to search.
@@ -177,87 +597,296 @@ class DHeap:
             return the position of the element if is present else -1.
         """
 
+        if self._positions is not None:
+            return self._positions.get(element, -1)
+
         for i, pair in enumerate(self._pairs):
             if pair[0] == element:
                 return i
         return -1
 
 
-    def __get_parent_index(self, children_idx: int) -> int:
-        return (children_idx - 1) // self.d 
+    def __top_k_indices(self, k: int) -> list[int]:
+        """
+        Visit the tree from the root keeping a frontier heap of the positions that can be the next in priority order:
+        every time a position is extracted from the frontier, its children are added.
+        Running time: O(k * D * log(k)).
+
+        Return:
+            the positions of the first k elements, ordered by priority.
+        """
+
+        k = min(k, len(self))
+        result: list[int] = []
+        if k <= 0:
+            return result
 
+        #The frontier stores the keys of this heap, so it's always a min heap. For a stable heap the key is paired with the
+        #sequence number, to break the ties.
+        order = self._order
+        frontier = DHeap(self.d, "min")
+        frontier.insert(0, self._pairs[0][1] if order is None else (self._pairs[0][1], order[0]))
+        while len(result) < k:
+            idx = frontier.top()
+            result.append(idx)
 
-    def __get_first_children_idx(self, parent_idx: int) -> int:
-        return self.d * parent_idx + 1 
+            first_children_idx = self.__get_first_children_idx(idx)
+            for child_idx in range(first_children_idx, min(first_children_idx + self.d, len(self))):
+                frontier.insert(child_idx, self._pairs[child_idx][1] if order is None else (self._pairs[child_idx][1], order[child_idx]))
+
+        return result
 
 
-    def __get_first_priority_children_idx(self, parent_idx: int) -> int:
+    def __record(self, operation: str, bubble_up_levels: int = -1, push_down_levels: int = -1) -> None:
+        """
+        Update the stats after an operation and, if the heap is auto tuned, check if it's time to retune it.
+
+        Args:
+            operation: name of the counter of DHeapStats to increment.
+            bubble_up_levels, push_down_levels: levels crossed by the sift routine called by the operation (-1 if not called).
+        """
+
+        stats = self.stats
+        setattr(stats, operation, getattr(stats, operation) + 1)
+        if bubble_up_levels >= 0:
+            stats.bubble_ups += 1
+            stats.bubble_up_levels += bubble_up_levels
+        if push_down_levels >= 0:
+            stats.push_downs += 1
+            stats.push_down_levels += push_down_levels
+
+        self.__check_retune()
+
+
+    def __record_rebuild(self, operation: str, count: int, push_downs: int, push_down_levels: int) -> None:
+        """
+        Update the stats after a bulk operation (insert_many, merge, pop_many) that rebuilt the heap bottom-up: the operation
+        counts for every element and the push downs of the rebuild are observed as any other sift.
+
+        Args:
+            operation: name of the counter of DHeapStats to increment.
+            count: number of elements inserted or extracted.
+            push_downs, push_down_levels: returned by __rebuild.
+        """
+
+        stats = self.stats
+        setattr(stats, operation, getattr(stats, operation) + count)
+        stats.push_downs += push_downs
+        stats.push_down_levels += push_down_levels
+        self.__check_retune()
+
+
+    def __check_retune(self) -> None:
+        """
+        If the heap is auto tuned and enough operations have been observed since the last retune, retune it.
+        """
+
+        if self._auto_tune:
+            stats = self.stats
+            snapshot = self._tune_snapshot
+            operations = (stats.inserts + stats.tops + stats.updates + stats.removes 
+                          - snapshot.inserts - snapshot.tops - snapshot.updates - snapshot.removes)
+            if operations >= max(DHeap.AutoTuneInterval, len(self)):
+                self.retune()
+
+
+    def __observed_sifts(self) -> tuple[int, int, int, int]:
         """
         Return:
-            The children with the highest/lower priority (depends if the heap is max or min).
-            If there are multiple children with the same priority, return the leftmost.
-        """
-        first_children_idx = self.__get_first_children_idx(parent_idx)
-        last_children_idx = min(first_children_idx + self.d, len(self))
-
-        current_priority = self._pairs[first_children_idx][1]
-        current_idx = first_children_idx
-        for i in range(first_children_idx, last_children_idx):
-            if not self.comparator(current_priority, self._pairs[i][1]):
-                current_priority = self._pairs[i][1]
-                current_idx = i
-        
-        return current_idx
+            bubble ups, bubble up levels, push downs and push down levels observed since the last retune.
+        """
+        stats = self.stats
+        snapshot = self._tune_snapshot
+        return (stats.bubble_ups - snapshot.bubble_ups, stats.bubble_up_levels - snapshot.bubble_up_levels,
+                stats.push_downs - snapshot.push_downs, stats.push_down_levels - snapshot.push_down_levels)
+
+
+    def __estimated_cost(self, d: int, bubble_ups: int, bubble_up_levels: int, push_downs: int, push_down_levels: int) -> float:
+        """
+        Estimated number of comparisons of the observed sifts if the branching factor were d (see recommend_branching_factor).
+        With a branching factor of 1 the height of the tree is N instead of log(N).
+        """
+        if d == self.d:
+            scale = 1.0
+        elif self.d < 2:
+            scale = math.log(max(len(self), 2), d) / max(len(self), 1)
+        else:
+            scale = math.log(self.d) / math.log(d)
+        return bubble_ups + bubble_up_levels * scale + (push_downs + push_down_levels * scale) * d
+
+
+    def __get_first_children_idx(self, parent_idx: int) -> int:
+        return self.d * parent_idx + 1 
 
         
     def __get_first_leaf_idx(self) -> int:
         return (len(self) - 2) // self.d + 1
 
     
-    def __bubble_up(self, idx: int) -> None:
+    def __bubble_up(self, idx: int) -> int:
         """
         Fix the problem of a child with higher/lower priority than the parent.
+        The keys are compared with the operator < (see the class description).
         
         Args:
             idx: index of the node to check.
+        Return:
+            the number of levels crossed by the node.
         """
 
-        current = self._pairs[idx]
+        pairs = self._pairs
+        positions = self._positions
+        d = self.d
 
-        parent_idx = self.__get_parent_index(idx)
+        current = pairs[idx]
+        #remember that self._pairs is a list of tuple where tuple[1] is the priority
+        priority = current[1]
+        levels = 0
         while idx > 0:
-            #remember that self._pairs is a list of tuple where tuple[1] is the priority
-            if self.comparator(current[1], self._pairs[parent_idx][1]): 
-                self._pairs[idx] = self._pairs[parent_idx]
-                idx = parent_idx
-                parent_idx = self.__get_parent_index(idx)
-            else:
+            parent_idx = (idx - 1) // d
+            parent = pairs[parent_idx]
+            if not priority < parent[1]:
                 break
 
-        self._pairs[idx] = current
+            pairs[idx] = parent
+            if positions is not None:
+                positions[parent[0]] = idx
+            idx = parent_idx
+            levels += 1
+
+        pairs[idx] = current
+        if positions is not None:
+            positions[current[0]] = idx
+        return levels
 
     
-    def __push_down(self, idx: int) -> None:
+    def __push_down(self, idx: int) -> int:
         """
         Fix the problem of a parent with lower/higher priority than a child.
+        The keys are compared with the operator < (see the class description).
         
         Args:
             idx: index of the node to check.
+        Return:
+            the number of levels crossed by the node.
         """
 
-        current = self._pairs[idx]
-        first_leaf_idx = self.__get_first_leaf_idx()
+        pairs = self._pairs
+        positions = self._positions
+        d = self.d
+        n = len(pairs)
+
+        current = pairs[idx]
+        priority = current[1]
+        levels = 0
+        first_leaf_idx = (n - 2) // d + 1
         while idx < first_leaf_idx:
-            first_priority_children_idx = self.__get_first_priority_children_idx(idx)
-            first_priority_children = self._pairs[first_priority_children_idx]
+            #Search the child with the highest/lowest priority; if there are multiple children with the same priority, take the leftmost.
+            first_children_idx = d * idx + 1
+            child_idx = first_children_idx
+            child_priority = pairs[first_children_idx][1]
+            for i in range(first_children_idx + 1, min(first_children_idx + d, n)):
+                if pairs[i][1] < child_priority:
+                    child_priority = pairs[i][1]
+                    child_idx = i
+
+            if not child_priority < priority:
+                break
 
-            if not self.comparator(current[1], first_priority_children[1]):
-                self._pairs[idx] = self._pairs[first_priority_children_idx]
-                idx = first_priority_children_idx
-            else:
+            child = pairs[child_idx]
+            pairs[idx] = child
+            if positions is not None:
+                positions[child[0]] = idx
+            idx = child_idx
+            levels += 1
+
+        pairs[idx] = current
+        if positions is not None:
+            positions[current[0]] = idx
+        return levels
+
+
+    def __stable_bubble_up(self, idx: int) -> int:
+        """
+        Same as __bubble_up, but if 2 priorities are equal the node with the lower sequence number (inserted first) wins.
+        The sequence numbers in self._order are moved together with the pairs.
+        """
+
+        pairs = self._pairs
+        order = self._order
+        positions = self._positions
+        d = self.d
+
+        current = pairs[idx]
+        priority = current[1]
+        seq = order[idx]
+        levels = 0
+        while idx > 0:
+            parent_idx = (idx - 1) // d
+            parent = pairs[parent_idx]
+            parent_priority = parent[1]
+            if not (priority < parent_priority or (not parent_priority < priority and seq < order[parent_idx])):
                 break
 
-        self._pairs[idx] = current
+            pairs[idx] = parent
+            order[idx] = order[parent_idx]
+            if positions is not None:
+                positions[parent[0]] = idx
+            idx = parent_idx
+            levels += 1
+
+        pairs[idx] = current
+        order[idx] = seq
+        if positions is not None:
+            positions[current[0]] = idx
+        return levels
+
+
+    def __stable_push_down(self, idx: int) -> int:
+        """
+        Same as __push_down, but if 2 priorities are equal the node with the lower sequence number (inserted first) wins.
+        The sequence numbers in self._order are moved together with the pairs.
+        """
+
+        pairs = self._pairs
+        order = self._order
+        positions = self._positions
+        d = self.d
+        n = len(pairs)
+
+        current = pairs[idx]
+        priority = current[1]
+        seq = order[idx]
+        levels = 0
+        first_leaf_idx = (n - 2) // d + 1
+        while idx < first_leaf_idx:
+            first_children_idx = d * idx + 1
+            child_idx = first_children_idx
+            child_priority = pairs[first_children_idx][1]
+            child_seq = order[first_children_idx]
+            for i in range(first_children_idx + 1, min(first_children_idx + d, n)):
+                p = pairs[i][1]
+                if p < child_priority or (not child_priority < p and order[i] < child_seq):
+                    child_priority = p
+                    child_seq = order[i]
+                    child_idx = i
+
+            if not (child_priority < priority or (not priority < child_priority and child_seq < seq)):
+                break
+
+            child = pairs[child_idx]
+            pairs[idx] = child
+            order[idx] = child_seq
+            if positions is not None:
+                positions[child[0]] = idx
+            idx = child_idx
+            levels += 1
+
+        pairs[idx] = current
+        order[idx] = seq
+        if positions is not None:
+            positions[current[0]] = idx
+        return levels
 
     
     def _heapify(self, elements: list[Any], priorities: list[int]) -> None:
@@ -271,10 +900,34 @@ class DHeap:
 
         assert(len(elements) == len(priorities))
 
+        if self._key is not None:
+            priorities = map(self._key, priorities)
         self._pairs = list(zip(elements, priorities))
+        if self._order is not None:
+            self._order = array("q", range(len(self._pairs)))
+            self._counter = len(self._pairs)
+        if self._positions is not None:
+            self._positions = {element: i for i, element in enumerate(elements)}
+            if len(self._positions) != len(elements):
+                raise ValueError("An indexed heap can't contain duplicate elements.")
+
+        self.__rebuild()
+
+
+    def __rebuild(self) -> tuple[int, int]:
+        """
+        Restore the heap invariants on the whole underlying list, pushing down every internal node from the last one to the root.
+        Running time: O(N).
+
+        Return:
+            the number of push downs and the total number of levels crossed, for the stats.
+        """
+
         first_leaf_idx = self.__get_first_leaf_idx() - 1
+        levels = 0
         for i in range(first_leaf_idx, -1, -1):
-            self.__push_down(i)
+            levels += self.__push_down(i)
+        return max(first_leaf_idx + 1, 0), levels
         
 
     #this function is taken from: 
@@ -293,8 +946,559 @@ class DHeap:
             first_child = self.__get_first_children_idx(current_index)
             last_child_guard = min(first_child + self.d, len(self))
             for child_index in range(first_child, last_child_guard):
-                if current_priority < self._pairs[child_index][1]:
+                child_priority = self._pairs[child_index][1]
+                if child_priority < current_priority:
+                    return False
+                #In a stable heap, the parent must also be inserted before the children with the same priority.
+                if (self._order is not None and not current_priority < child_priority 
+                        and self._order[child_index] < self._order[current_index]):
                     return False
             current_index += 1
         return True
-    
\ No newline at end of file
+
+
+
+class ArrayDHeap:
+    """
+    A DHeap with the same public interface of DHeap, but the elements and the priorities are stored in 2 parallel arrays:
+    the priorities are kept in a compact array('d') of floats and the elements in a list. The sift operations compare only the 
+    priorities and move the element slots along with them, so there is no tuple allocation for every insert/update.
+    The priorities must be numbers. As in DHeap, the sift routines use only the operator <: the priorities of a 'max' heap are 
+    stored negated.
+
+    If the elements are numbers too (for example the ids of the nodes of a graph), pass element_typecode (for example 'q' for
+    64 bit ints) to store them in an array instead of a list: an entry then costs 16 bytes (8 for the element and 8 for the 
+    priority) instead of a pointer plus a boxed object. The arrays grow geometrically, so append is O(1) amortized.
+    memory_usage returns the size of the heap in bytes.
+    """
+
+    def __init__(self, branching_factor: int = 2, comparator: str = "max", 
+                    elements: list[Any]= None, priorities: list[float] = None, indexed: bool = False, 
+                    element_typecode: Optional[str] = None):
+        """
+        Args:
+        branching_factor: how many childrens has a parent.
+        comparator: 'max' for max heap and 'min' for min heap.
+        elements(optional): list of elements. Note that elements[i] should correspond to the element associated to the priority priorities[i].
+        priorities(optional): list of prioritities. Note that priority[i] should correspond to the prioririty associated to the element elements[i].
+        indexed(optional): if true, keep a map element -> position so that contains is O(1) and update, remove are O(log(N)).
+        element_typecode(optional): typecode of the array module ('q', 'l', 'i', 'd', ...) to store numeric elements in an array.
+        """
+
+        self.d = branching_factor 
+        self.comparator: Callable[[float, float], bool] = None
+        self._negate = False
+        
+        if comparator == "max":
+            self.comparator = lambda x, y: x > y
+            self._negate = True
+        elif comparator == "min":
+            self.comparator = lambda x, y: x < y
+        else:
+            raise ValueError("The comparator should be 'max' or 'min'.")
+
+        self._element_typecode = element_typecode
+        self._elements: Union[list[Any], array] = self.__new_elements([])
+        self._priorities: array = array("d")
+        self._positions: Optional[dict[Any, int]] = {} if indexed else None
+
+        if elements is not None and priorities is not None:
+            self._heapify(elements, priorities)
+
+
+    # ******************************* PUBLIC INTERFACE *****************************************
+
+    def insert(self, element: Any, priority: float) -> None:
+        """
+        Insert an element with an associated priority. 
+        Running time: O(log(N) in base branching factor).
+
+        Args:
+            element: element to insert.
+            priority: priority associated.
+        """
+
+        #Convert the priority before modifying the heap, so that a priority that is not a number raises TypeError and leaves
+        #the heap unchanged.
+        priority = float(priority)
+        if self._negate:
+            priority = -priority
+
+        if self._positions is not None and element in self._positions:
+            raise ValueError("The element is already in the heap.")
+
+        #With an element typecode, an element that doesn't fit raises here, before anything else is modified.
+        self._elements.append(element)
+        if self._positions is not None:
+            self._positions[element] = len(self._priorities)
+        self._priorities.append(priority)
+        self.__bubble_up(len(self) - 1)
+
+
+    def insert_many(self, elements: list[Any], priorities: list[float]) -> None:
+        """
+        Insert a batch of elements with the associated priorities.
+        If the batch is large compared to the heap, the arrays are extended and the heap is rebuilt bottom-up,
+        otherwise every pair is inserted with a bubble up.
+        Running time: O(min(M * log(N + M), N + M)) where M is the size of the batch.
+
+        Args:
+            elements: list of elements to insert.
+            priorities: list of priorities. Note that priorities[i] should correspond to the priority of elements[i].
+        """
+
+        assert(len(elements) == len(priorities))
+
+        #Convert the batch before modifying the heap: a priority that is not a number or an element that doesn't fit the
+        #element typecode raises and leaves the heap unchanged.
+        priorities = array("d", priorities)
+        if self._negate:
+            priorities = array("d", [-priority for priority in priorities])
+        elements = self.__new_elements(elements)
+
+        positions = self._positions
+        if positions is not None:
+            batch = set(elements)
+            if len(batch) != len(elements) or not batch.isdisjoint(positions):
+                raise ValueError("The element is already in the heap.")
+
+        if not _prefer_heapify(len(self), len(elements), self.d):
+            for element, priority in zip(elements, priorities):
+                if positions is not None:
+                    positions[element] = len(self)
+                self._elements.append(element)
+                self._priorities.append(priority)
+                self.__bubble_up(len(self) - 1)
+            return
+
+        if positions is not None:
+            for i, element in enumerate(elements, len(self)):
+                positions[element] = i
+        self._elements.extend(elements)
+        self._priorities.extend(priorities)
+        self.__rebuild()
+
+
+    def top(self) -> Any:
+        """
+        Extract the root of the heap (that is the element with the min/max priority).
+        Running time: O(log(N) in base branching factor).
+
+        Return:
+            the root of the heap if the heap is not empty or raise an expection.
+        """
+
+        if self.empty():
+            raise IndexError("Empty heap.")
+
+        last_element = self._elements.pop()
+        last_priority = self._priorities.pop()
+        if self.empty():
+            if self._positions is not None:
+                del self._positions[last_element]
+            return last_element
+
+        root = self._elements[0]
+        if self._positions is not None:
+            del self._positions[root]
+        self._elements[0] = last_element
+        self._priorities[0] = last_priority
+        self.__push_down(0)
+
+        return root
+
+
+    def remove(self, element: Any) -> None:
+        """
+        Remove the given element if present.
+        Running time: O(n), O(log(N) in base branching factor) if the heap is indexed.
+
+        Args:
+            element: the element to remove.
+        """
+
+        idx = self.__find(element)
+
+        if idx == -1:
+            raise IndexError("The element is not in the heap.")
+
+        last_element = self._elements.pop()
+        last_priority = self._priorities.pop()
+        if self._positions is not None:
+            del self._positions[element]
+
+        #The removed element was the last leaf, so there is nothing to fix.
+        if idx == len(self):
+            return
+
+        priority = self._priorities[idx]
+        self._elements[idx] = last_element
+        self._priorities[idx] = last_priority
+        if self._positions is not None:
+            self._positions[last_element] = idx
+
+        if priority < last_priority:
+            self.__push_down(idx)
+        else:
+            self.__bubble_up(idx)
+
+
+    def peek(self) -> Any:
+        """
+        Running time: O(1).
+        Return:
+            Return the element at the root of the heap without extracting it.
+        """
+
+        if self.empty():
+            raise IndexError("Empty heap.")
+
+        return self._elements[0]
+
+
+    def pop_many(self, k: int) -> list[Any]:
+        """
+        Extract the k elements with the highest/lowest priority (less if the heap has less than k elements).
+        If k is large compared to the heap, the first k positions are found as in peek_k and the remaining slots are rebuilt
+        bottom-up, otherwise top is called k times.
+        Running time: O(min(k * D * log(N), N + k * D * log(k))) where D is the branching factor.
+
+        Args:
+            k: number of elements to extract.
+        Return:
+            the list of the extracted elements, ordered by priority.
+        """
+
+        k = min(k, len(self))
+        if not _prefer_rebuild(len(self), k, self.d):
+            return [self.top() for _ in range(k)]
+
+        top_indices = self.__top_k_indices(k)
+        result = [self._elements[i] for i in top_indices]
+
+        taken = set(top_indices)
+        kept = [i for i in range(len(self)) if i not in taken]
+        self._elements = self.__new_elements(self._elements[i] for i in kept)
+        self._priorities = array("d", [self._priorities[i] for i in kept])
+        if self._positions is not None:
+            self._positions = {element: i for i, element in enumerate(self._elements)}
+        self.__rebuild()
+
+        return result
+
+
+    def peek_k(self, k: int) -> list[Any]:
+        """
+        Return (without extracting them) the k elements with the highest/lowest priority.
+        The heap is not modified: the d-ary tree is visited from the root with an auxiliary frontier heap.
+        Running time: O(k * D * log(k)) where D is the branching factor.
+
+        Args:
+            k: number of elements to return.
+        Return:
+            the list of the first k elements, ordered by priority.
+        """
+
+        return [self._elements[i] for i in self.__top_k_indices(k)]
+
+
+    def merge(self, other: "ArrayDHeap") -> None:
+        """
+        Add all the elements of another heap (that is not modified). If the other heap is large compared to this one, its arrays 
+        are appended to the arrays of this heap and the heap is rebuilt bottom-up, otherwise every slot is inserted with a bubble up.
+        The heaps must have the same comparator and a heap can't be merged with itself.
+        Running time: O(min(M * log(N + M), N + M)) where M is the size of the other heap.
+
+        Args:
+            other: the heap to merge into this one.
+        """
+
+        if not isinstance(other, ArrayDHeap):
+            raise TypeError("An ArrayDHeap can only be merged with another ArrayDHeap.")
+
+        if other is self:
+            raise ValueError("A heap can't be merged with itself.")
+
+        if self._negate != other._negate:
+            raise ValueError("The heaps must have the same comparator.")
+
+        #If other is not indexed it can contain the same element twice.
+        if self._positions is not None:
+            batch = set(other._elements)
+            if len(batch) != len(other) or not batch.isdisjoint(self._positions):
+                raise ValueError("The element is already in the heap.")
+
+        if not _prefer_heapify(len(self), len(other), self.d):
+            for element, priority in zip(other._elements, other._priorities):
+                if self._positions is not None:
+                    self._positions[element] = len(self)
+                self._elements.append(element)
+                self._priorities.append(priority)
+                self.__bubble_up(len(self) - 1)
+            return
+
+        if self._positions is not None:
+            for i, element in enumerate(other._elements, len(self)):
+                self._positions[element] = i
+        self._elements.extend(self.__new_elements(other._elements))
+        self._priorities.extend(other._priorities)
+        self.__rebuild()
+
+
+    def __ior__(self, other: "ArrayDHeap") -> "ArrayDHeap":
+        """
+        heap |= other is the same as heap.merge(other).
+        """
+        self.merge(other)
+        return self
+
+
+    def contains(self, element: Any) -> bool:
+        """
+        Running time: O(n), O(1) if the heap is indexed.
+
+        Args:
+            element: the element to search.
+        Return:
+            return true if the element is present else false.
+        """
+        return self.__find(element) >= 0
+
+
+    def update(self, element: Any, new_priority: float) -> None:
+        """
+        Update the priority of an element.
+        Running time: O(n), O(log(N) in base branching factor) if the heap is indexed.
+
+        Args:
+            element: an object.
+            new_priority: the new priority.
+        """
+
+        element_idx = self.__find(element)
+
+        if element_idx == -1:
+            raise IndexError("The element is not in the heap.")
+
+        if self._negate:
+            new_priority = -new_priority
+        old_priority = self._priorities[element_idx]
+        self._priorities[element_idx] = new_priority
+
+        if new_priority < old_priority:
+            self.__bubble_up(element_idx)
+        else:
+            self.__push_down(element_idx)
+
+
+    def memory_usage(self) -> int:
+        """
+        Estimate the memory used by the heap with sys.getsizeof: the arrays, the elements (if they are stored in a list) and the 
+        auxiliary structures. The objects shared by many slots are counted for every reference.
+        Running time: O(1) if the elements are stored in an array, O(n) otherwise.
+
+        Return:
+            the number of bytes.
+        """
+
+        size = sys.getsizeof(self._elements) + sys.getsizeof(self._priorities)
+        if self._element_typecode is None:
+            size += sum(map(sys.getsizeof, self._elements))
+        if self._positions is not None:
+            size += sys.getsizeof(self._positions)
+        return size
+
+
+    def empty(self) -> bool:
+        return len(self) == 0
+    
+    def __len__(self):
+        return len(self._priorities)
+
+    # ******************************* END OF PUBLIC INTERFACE *****************************************
+
+
+    def __find(self, element: Any) -> int:
+        """
+        Find a specific element. 
+        Running time: O(n), O(1) if the heap is indexed.
+
+        Args:
+            element: element to search.
+        Return:
+            return the position of the element if is present else -1.
+        """
+
+        if self._positions is not None:
+            return self._positions.get(element, -1)
+
+        try:
+            return self._elements.index(element)
+        except ValueError:
+            return -1
+
+
+    def __top_k_indices(self, k: int) -> list[int]:
+        """
+        Visit the tree from the root keeping a frontier heap of the positions that can be the next in priority order:
+        every time a position is extracted from the frontier, its children are added.
+        Running time: O(k * D * log(k)).
+
+        Return:
+            the positions of the first k elements, ordered by priority.
+        """
+
+        k = min(k, len(self))
+        result: list[int] = []
+        if k <= 0:
+            return result
+
+        #The frontier stores the keys of this heap, so it's always a min heap.
+        frontier = ArrayDHeap(self.d, "min", element_typecode="q")
+        frontier.insert(0, self._priorities[0])
+        while len(result) < k:
+            idx = frontier.top()
+            result.append(idx)
+
+            first_children_idx = self.d * idx + 1
+            for child_idx in range(first_children_idx, min(first_children_idx + self.d, len(self))):
+                frontier.insert(child_idx, self._priorities[child_idx])
+
+        return result
+
+
+
+    def __new_elements(self, elements: Iterable[Any]) -> Union[list[Any], array]:
+        """
+        Return:
+            a new container for the elements: an array if the heap has an element typecode, otherwise a list.
+        """
+        if self._element_typecode is not None:
+            return array(self._element_typecode, elements)
+        return list(elements)
+
+
+    def __get_first_leaf_idx(self) -> int:
+        return (len(self) - 2) // self.d + 1
+
+
+    def __bubble_up(self, idx: int) -> None:
+        """
+        Fix the problem of a child with higher/lower priority than the parent.
+        Only the priorities are compared, the element slots are moved together with them.
+        
+        Args:
+            idx: index of the node to check.
+        """
+
+        elements = self._elements
+        priorities = self._priorities
+        positions = self._positions
+        d = self.d
+
+        current_element = elements[idx]
+        current_priority = priorities[idx]
+        while idx > 0:
+            parent_idx = (idx - 1) // d
+            if not current_priority < priorities[parent_idx]:
+                break
+
+            elements[idx] = elements[parent_idx]
+            priorities[idx] = priorities[parent_idx]
+            if positions is not None:
+                positions[elements[idx]] = idx
+            idx = parent_idx
+
+        elements[idx] = current_element
+        priorities[idx] = current_priority
+        if positions is not None:
+            positions[current_element] = idx
+
+
+    def __push_down(self, idx: int) -> None:
+        """
+        Fix the problem of a parent with lower/higher priority than a child.
+        Only the priorities are compared, the element slots are moved together with them.
+        
+        Args:
+            idx: index of the node to check.
+        """
+
+        elements = self._elements
+        priorities = self._priorities
+        positions = self._positions
+        d = self.d
+        n = len(priorities)
+
+        current_element = elements[idx]
+        current_priority = priorities[idx]
+        first_leaf_idx = (n - 2) // d + 1
+        while idx < first_leaf_idx:
+            #Search the child with the highest/lowest priority.
+            first_children_idx = d * idx + 1
+            child_idx = first_children_idx
+            child_priority = priorities[first_children_idx]
+            for i in range(first_children_idx + 1, min(first_children_idx + d, n)):
+                if priorities[i] < child_priority:
+                    child_priority = priorities[i]
+                    child_idx = i
+
+            if not child_priority < current_priority:
+                break
+
+            elements[idx] = elements[child_idx]
+            priorities[idx] = child_priority
+            if positions is not None:
+                positions[elements[idx]] = idx
+            idx = child_idx
+
+        elements[idx] = current_element
+        priorities[idx] = current_priority
+        if positions is not None:
+            positions[current_element] = idx
+
+
+    def _heapify(self, elements: list[Any], priorities: list[float]) -> None:
+        """
+        Construct an heap from a list of elements and priorities.
+
+        Args:
+            elements: list of objects.
+            priorities: list of priorities associated to the elements.
+        """
+
+        assert(len(elements) == len(priorities))
+
+        self._elements = self.__new_elements(elements)
+        self._priorities = array("d", priorities)
+        if self._negate:
+            self._priorities = array("d", [-priority for priority in self._priorities])
+        if self._positions is not None:
+            self._positions = {element: i for i, element in enumerate(self._elements)}
+            if len(self._positions) != len(self._elements):
+                raise ValueError("An indexed heap can't contain duplicate elements.")
+
+        self.__rebuild()
+
+
+    def __rebuild(self) -> None:
+        """
+        Restore the heap invariants on the whole arrays, pushing down every internal node from the last one to the root.
+        Running time: O(N).
+        """
+
+        first_leaf_idx = self.__get_first_leaf_idx() - 1
+        for i in range(first_leaf_idx, -1, -1):
+            self.__push_down(i)
+
+
+    def _validate(self) -> bool:
+        """
+        Checks that every node holds the highest priority (with respect to the comparator) in the subtree rooted at that node.
+        Returns: True if all the heap invariants are met.
+        """
+        for child_index in range(1, len(self)):
+            parent_index = (child_index - 1) // self.d
+            if self._priorities[child_index] < self._priorities[parent_index]:
+                return False
+        return True
@@ -1,5 +1,7 @@
+import operator
+from array import array
 from dataclasses import dataclass, field
-from typing import Any, Iterable
+from typing import Any, Iterable, Optional
 
 
 class DisjointSetArray:
@@ -19,6 +21,7 @@ class DisjointSetArray:
 
         for elem in set(initial_set):
             self.partions_map[elem] = [elem]
+        self.partitions_count = len(self.partions_map)
         
 
     def add(self, elem: Any) -> bool:
@@ -34,6 +37,7 @@ class DisjointSetArray:
             return False
 
         self.partions_map[elem] = [elem]
+        self.partitions_count += 1
         return True
 
 
@@ -94,9 +98,34 @@ class DisjointSetArray:
                 p1.append(elem)
                 self.partions_map[elem] = p1
         
+        self.partitions_count -= 1
         return True
 
 
+    def members(self, elem: Any) -> list[Any]:
+        """
+        Return the elements in the same partition of the passed element (the partition itself, it should not be modified).
+        Running time: O(1).
+        """
+        return self.find_partition(elem)
+
+
+    def partition_size(self, elem: Any) -> int:
+        """
+        Return the number of elements in the partition of the passed element.
+        Running time: O(1).
+        """
+        return len(self.find_partition(elem))
+
+
+    def num_partitions(self) -> int:
+        """
+        Return the number of partitions.
+        Running time: O(1).
+        """
+        return self.partitions_count
+
+
 
 class Info:
     def __init__(self, elem: Any):
@@ -104,10 +133,13 @@ class Info:
             raise ValueError("Passed element is None")
         
         self.root = elem
+        #The rank of a root is the number of elements in its partition.
         self.rank = 1
+        #The members of a partition are linked in a circular list, so they can be visited without scanning every element.
+        self.next = elem
 
 
-#TODO: test and performance.
+#TODO: test. (performance: see profile/disjointset_profile.py)
 @dataclass
 class DisjointSet:
     """
@@ -115,6 +147,7 @@ class DisjointSet:
     merge and find partition as compared to the version using array or tree as underlying container.
     """
     parents_map: dict[Any, Info] = field(default_factory=dict, init=False)
+    partitions_count: int = field(default=0, init=False)
     
 
     def add(self, elem: Any) -> bool:
@@ -126,10 +159,11 @@ class DisjointSet:
             true if the element is inserted, false if the element is already present.
         """
 
-        if elem in self.partions_map:
+        if elem in self.parents_map:
             return False
 
-        self.partions_map[elem] = Info(elem)
+        self.parents_map[elem] = Info(elem)
+        self.partitions_count += 1
         return True
 
     
@@ -194,5 +228,448 @@ class DisjointSet:
         else:
             info1.root = info2.root
             info2.rank += info1.rank
-        
-        return True
\ No newline at end of file
+
+        #Splice the 2 circular lists of members.
+        info1.next, info2.next = info2.next, info1.next
+        self.partitions_count -= 1
+        return True
+
+
+    def members(self, elem: Any) -> list[Any]:
+        """
+        Return the elements in the same partition of the passed element, following the circular list of members.
+        Running time: O(k) where k is the size of the partition.
+        """
+        if elem not in self.parents_map:
+            raise IndexError("Elem is not present.")
+
+        result = [elem]
+        current = self.parents_map[elem].next
+        while current != elem:
+            result.append(current)
+            current = self.parents_map[current].next
+        return result
+
+
+    def partition_size(self, elem: Any) -> int:
+        """
+        Return the number of elements in the partition of the passed element.
+        Ammortized running time: the same as the find_partition function.
+        """
+        return self.parents_map[self.find_partition(elem)].rank
+
+
+    def num_partitions(self) -> int:
+        """
+        Return the number of partitions.
+        Running time: O(1).
+        """
+        return self.partitions_count
+
+
+
+class CompactDisjointSet:
+    """
+    Implementation of disjoint set with union by rank and path halving, where the forest is stored in arrays instead of
+    objects: every element is mapped to a dense integer id when it's added, parents[id] is the id of the parent and ranks[id]
+    the rank of the tree (only meaningful for the roots). An element costs 4 bytes for the parent, 1 byte for the rank and 
+    the entry in the map element -> id; with of_size the elements are the ints 0..n-1 and the map is not needed at all.
+    The find is iterative, so there is no recursion limit on long chains.
+    """
+
+    def __init__(self, initial_set: Iterable[Any] = ()):
+        """
+        Running time: O(n) where n is the number of elements in the initial set.
+        Args:
+            initial_set(optional): an initial set of element for initialize the partions.
+        """
+        #None means that the elements are the ids themselves (see of_size).
+        self._ids: Optional[dict[Any, int]] = {}
+        self._elements: list[Any] = []
+        self._parents = array("i")
+        #The rank is at most log2(n), so a byte is enough.
+        self._ranks = array("B")
+
+        for elem in initial_set:
+            self.add(elem)
+
+
+    @classmethod
+    def of_size(cls, n: int) -> "CompactDisjointSet":
+        """
+        Create a disjoint set of the ints 0..n-1, each one in its own partition, without the map element -> id.
+        Running time: O(n).
+        """
+        ds = cls()
+        ds._ids = None
+        ds._elements = None
+        ds._parents = array("i", range(n))
+        ds._ranks = array("B", bytes(n))
+        return ds
+
+
+    def add(self, elem: Any) -> bool:
+        """
+        Running time: O(1).
+        Args:
+            elem: the element should be of the same type as the others (an int equal to the size for a set built with of_size).
+        Return:
+            true if the element is inserted, false if the element is already present.
+        """
+
+        new_id = len(self._parents)
+        if self._ids is None:
+            try:
+                elem_id = operator.index(elem)
+            except TypeError:
+                raise ValueError("A disjoint set built with of_size can only add the next int.")
+            if elem_id != new_id:
+                if 0 <= elem_id < new_id:
+                    return False
+                raise ValueError("A disjoint set built with of_size can only add the next int.")
+        else:
+            if elem in self._ids:
+                return False
+            self._ids[elem] = new_id
+            self._elements.append(elem)
+
+        self._parents.append(new_id)
+        self._ranks.append(0)
+        return True
+
+
+    def are_disjoint(self, elem1: Any, elem2: Any) -> bool:
+        """
+        Check if the 2 elements are in the same partition.
+        Ammortized running time: O(Ack(n)), see find_partition.
+        Return:
+            Return true if the elements are not in the same partion, false otherwise.
+        """
+        return self._find(self._id(elem1)) != self._find(self._id(elem2))
+
+
+    def find_partition(self, elem: Any) -> Any:
+        """
+        Return the partition (the root element) of the passed element.
+        Ammortized running time: O(Ack(n)) where Ack is the inverse of Ackermann.
+        Args:
+            elem: element to check the partition. If not present, the method raise an exception.
+        Return:
+            return the root element of the partition.
+        """
+        return self._element(self._find(self._id(elem)))
+
+
+    def merge(self, elem1: Any, elem2: Any) -> bool:
+        """
+        Merge the 2 partitions associated to the 2 passed elements.
+        Ammortized running time: O(Ack(n)), see find_partition.
+        Return:
+            True if the merge success, false if the 2 partions are equal.
+        """
+        return self._union(self._find(self._id(elem1)), self._find(self._id(elem2)))
+
+
+    def merge_many(self, pairs: Iterable[tuple[Any, Any]]) -> int:
+        """
+        Merge the partitions of every pair of elements, for example the edges of a graph. The pairs can be any iterable of 
+        2 elements sequences (a list of tuples, the rows of a 2D array, zip(sources, destinations), ...). The lookups of the
+        ids, the finds and the unions are done inline, without a method call for every pair.
+        Ammortized running time: O(m * Ack(n)) where m is the number of pairs.
+        Return:
+            the number of merges that succeeded (pairs that were in different partitions).
+        """
+
+        parents = self._parents
+        ranks = self._ranks
+        ids = self._ids
+        index = operator.index
+        merged = 0
+        for elem1, elem2 in pairs:
+            #Same checks of _id.
+            if ids is None:
+                try:
+                    root1 = index(elem1)
+                    root2 = index(elem2)
+                except TypeError:
+                    raise IndexError("Elem is not present.")
+                size = len(parents)
+                if not (0 <= root1 < size and 0 <= root2 < size):
+                    raise IndexError("Elem is not present.")
+            else:
+                root1 = ids.get(elem1)
+                root2 = ids.get(elem2)
+                if root1 is None or root2 is None:
+                    raise IndexError("Elem is not present.")
+
+            parent = parents[root1]
+            while parent != root1:
+                parents[root1] = parents[parent]
+                root1 = parents[root1]
+                parent = parents[root1]
+
+            parent = parents[root2]
+            while parent != root2:
+                parents[root2] = parents[parent]
+                root2 = parents[root2]
+                parent = parents[root2]
+
+            if root1 == root2:
+                continue
+
+            if ranks[root1] < ranks[root2]:
+                root1, root2 = root2, root1
+            parents[root2] = root1
+            if ranks[root1] == ranks[root2]:
+                ranks[root1] += 1
+            merged += 1
+
+        return merged
+
+
+    def find_many(self, elems: Iterable[Any]) -> list[Any]:
+        """
+        Return the partition (the root element) of every passed element.
+        Ammortized running time: O(m * Ack(n)) where m is the number of elements.
+        """
+        find = self._find
+        get_id = self._id
+        get_element = self._element
+        return [get_element(find(get_id(elem))) for elem in elems]
+
+
+    def labels(self) -> array:
+        """
+        Label the partitions with dense ints 0..k-1, where k is the number of partitions.
+        Running time: O(n * Ack(n)).
+        Return:
+            an array where the i-th value is the label of the i-th added element (of the int i for a set built with of_size).
+        """
+
+        find = self._find
+        root_labels: dict[int, int] = {}
+        labels = array("i", [0]) * len(self._parents)
+        for elem_id in range(len(self._parents)):
+            labels[elem_id] = root_labels.setdefault(find(elem_id), len(root_labels))
+        return labels
+
+
+    def __len__(self):
+        return len(self._parents)
+
+    
+    def __contains__(self, elem: Any) -> bool:
+        if self._ids is None:
+            try:
+                return 0 <= operator.index(elem) < len(self._parents)
+            except TypeError:
+                return False
+        return elem in self._ids
+
+
+    def _id(self, elem: Any) -> int:
+        """
+        Return the dense id of an element, or raise an exception if the element is not present.
+        """
+        if self._ids is None:
+            try:
+                elem_id = operator.index(elem)
+            except TypeError:
+                raise IndexError("Elem is not present.")
+            if not 0 <= elem_id < len(self._parents):
+                raise IndexError("Elem is not present.")
+            return elem_id
+
+        elem_id = self._ids.get(elem)
+        if elem_id is None:
+            raise IndexError("Elem is not present.")
+        return elem_id
+
+
+    def _element(self, elem_id: int) -> Any:
+        return elem_id if self._elements is None else self._elements[elem_id]
+
+
+    def _find(self, elem_id: int) -> int:
+        """
+        Return the id of the root of the tree of elem_id. Path halving: every node in the path points to its grandparent.
+        """
+        parents = self._parents
+        parent = parents[elem_id]
+        while parent != elem_id:
+            grandparent = parents[parent]
+            parents[elem_id] = grandparent
+            elem_id = grandparent
+            parent = parents[elem_id]
+        return elem_id
+
+
+    def _union(self, root1: int, root2: int) -> bool:
+        """
+        Union by rank of 2 roots.
+        Return:
+            True if the roots are different (and so the trees are merged), else False.
+        """
+        if root1 == root2:
+            return False
+
+        ranks = self._ranks
+        if ranks[root1] < ranks[root2]:
+            root1, root2 = root2, root1
+        self._parents[root2] = root1
+        if ranks[root1] == ranks[root2]:
+            ranks[root1] += 1
+        return True
+
+
+
+class RollbackDisjointSet:
+    """
+    Implementation of disjoint set that can undo its operations, useful for offline dynamic connectivity and divide and conquer 
+    algorithms. It uses union by rank without path compression: a find is O(log(n)) and a merge changes only one parent and 
+    one rank, that are saved in a stack. snapshot returns the current position in the stack and rollback undoes the operations
+    (merges and adds) done after a snapshot.
+    As in CompactDisjointSet, the elements are mapped to dense ids and the forest is stored in arrays.
+    """
+
+    def __init__(self, initial_set: Iterable[Any] = ()):
+        """
+        Running time: O(n) where n is the number of elements in the initial set.
+        Args:
+            initial_set(optional): an initial set of element for initialize the partions.
+        """
+        self._ids: dict[Any, int] = {}
+        self._elements: list[Any] = []
+        self._parents = array("i")
+        self._ranks = array("B")
+        #Every entry is (child root, parent root, old rank of the parent) for a merge, (id, -1, 0) for an add.
+        self._history: list[tuple[int, int, int]] = []
+        self.partitions_count = 0
+
+        for elem in initial_set:
+            self.add(elem)
+
+
+    def add(self, elem: Any) -> bool:
+        """
+        Running time: O(1).
+        Return:
+            true if the element is inserted, false if the element is already present.
+        """
+
+        if elem in self._ids:
+            return False
+
+        new_id = len(self._parents)
+        self._ids[elem] = new_id
+        self._elements.append(elem)
+        self._parents.append(new_id)
+        self._ranks.append(0)
+        self._history.append((new_id, -1, 0))
+        self.partitions_count += 1
+        return True
+
+
+    def are_disjoint(self, elem1: Any, elem2: Any) -> bool:
+        """
+        Check if the 2 elements are in the same partition.
+        Running time: O(log(n)).
+        Return:
+            Return true if the elements are not in the same partion, false otherwise.
+        """
+        return self._find(self._id(elem1)) != self._find(self._id(elem2))
+
+
+    def find_partition(self, elem: Any) -> Any:
+        """
+        Return the partition (the root element) of the passed element. The tree is not compressed.
+        Running time: O(log(n)).
+        """
+        return self._elements[self._find(self._id(elem))]
+
+
+    def merge(self, elem1: Any, elem2: Any) -> bool:
+        """
+        Merge the 2 partitions associated to the 2 passed elements and save the change in the stack.
+        Running time: O(log(n)).
+        Return:
+            True if the merge success, false if the 2 partions are equal (in this case nothing is saved).
+        """
+
+        root1 = self._find(self._id(elem1))
+        root2 = self._find(self._id(elem2))
+        if root1 == root2:
+            return False
+
+        ranks = self._ranks
+        if ranks[root1] < ranks[root2]:
+            root1, root2 = root2, root1
+        self._history.append((root2, root1, ranks[root1]))
+        self._parents[root2] = root1
+        if ranks[root1] == ranks[root2]:
+            ranks[root1] += 1
+        self.partitions_count -= 1
+        return True
+
+
+    def snapshot(self) -> int:
+        """
+        Return:
+            a token for rollback: the number of operations saved in the stack.
+        """
+        return len(self._history)
+
+
+    def rollback(self, to: int = 0) -> None:
+        """
+        Undo the merges and the adds done after the passed snapshot, in reverse order.
+        Running time: O(k) where k is the number of undone operations.
+        Args:
+            to: a value returned by snapshot (0 undoes everything).
+        """
+
+        if not 0 <= to <= len(self._history):
+            raise ValueError("Invalid snapshot.")
+
+        while len(self._history) > to:
+            child, parent, old_rank = self._history.pop()
+            if parent == -1:
+                #Undo an add: the element is the last one in the arrays.
+                del self._ids[self._elements.pop()]
+                self._parents.pop()
+                self._ranks.pop()
+                self.partitions_count -= 1
+            else:
+                self._parents[child] = child
+                self._ranks[parent] = old_rank
+                self.partitions_count += 1
+
+
+    def num_partitions(self) -> int:
+        """
+        Return the number of partitions.
+        Running time: O(1).
+        """
+        return self.partitions_count
+
+
+    def __len__(self):
+        return len(self._parents)
+
+
+    def __contains__(self, elem: Any) -> bool:
+        return elem in self._ids
+
+
+    def _id(self, elem: Any) -> int:
+        elem_id = self._ids.get(elem)
+        if elem_id is None:
+            raise IndexError("Elem is not present.")
+        return elem_id
+
+
+    def _find(self, elem_id: int) -> int:
+        parents = self._parents
+        while parents[elem_id] != elem_id:
+            elem_id = parents[elem_id]
+        return elem_id
@@ -0,0 +1,148 @@
+import mmap
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+
+#Load the edges of a graph into a disjoint set straight from a file, without building the list of all the edges.
+#The file is memory-mapped and read in chunks of chunk_edges edges; every chunk is a flat array [u0, v0, u1, v1, ...], so
+#the peak memory is the disjoint set plus one chunk.
+#Two formats are supported:
+#- binary: the pairs of ints written one after the other in the native byte order, with the typecode of the array module
+#  ("i" for int32, "q" for int64), as produced by write_binary_edges;
+#- text: one edge per line, "u v" or "u,v"; the columns after the second (for example the weights) are ignored, as well as
+#  the empty lines and the comments starting with # or %.
+
+
+@dataclass
+class EdgeLoadStats:
+    """
+    Report of a load: the edges read, the merges that succeeded (edges between different partitions) and the elapsed time.
+    """
+    edges: int = 0
+    merges: int = 0
+    seconds: float = 0.0
+
+
+    @property
+    def edges_per_second(self) -> float:
+        return self.edges / self.seconds if self.seconds > 0 else 0.0
+
+
+def write_binary_edges(path: str, edges: Iterable[tuple[int, int]], typecode: str = "i") -> int:
+    """
+    Write the edges in the binary format read by read_binary_edges.
+    Args:
+        path: output file.
+        edges: iterable of pairs of ints.
+        typecode(optional): "i" for int32, "q" for int64 (any integer typecode of the array module works).
+    Return:
+        the number of edges written.
+    """
+
+    count = 0
+    buffer = array(typecode)
+    with open(path, "wb") as f:
+        for u, v in edges:
+            buffer.append(u)
+            buffer.append(v)
+            count += 1
+            if len(buffer) >= 1 << 16:
+                buffer.tofile(f)
+                del buffer[:]
+        buffer.tofile(f)
+    return count
+
+
+def read_binary_edges(path: str, typecode: str = "i", chunk_edges: int = 1 << 16) -> Iterator[array]:
+    """
+    Iterate a binary edge file in chunks.
+    Args:
+        path: input file.
+        typecode(optional): the typecode used to write the file.
+        chunk_edges(optional): number of edges of every chunk (the last one can be shorter).
+    Return:
+        an iterator of flat arrays [u0, v0, u1, v1, ...]; raise ValueError if the file is not made of whole pairs.
+    """
+
+    pair_size = 2 * array(typecode).itemsize
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size % pair_size != 0:
+            raise ValueError(f"The size of the file is not a multiple of {pair_size} bytes.")
+        if size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            step = chunk_edges * pair_size
+            for start in range(0, size, step):
+                chunk = array(typecode)
+                chunk.frombytes(mm[start:start + step])
+                yield chunk
+
+
+def read_text_edges(path: str, chunk_edges: int = 1 << 16) -> Iterator[array]:
+    """
+    Iterate a text edge file in chunks.
+    Args:
+        path: input file.
+        chunk_edges(optional): number of edges of every chunk (the last one can be shorter).
+    Return:
+        an iterator of flat arrays [u0, v0, u1, v1, ...] of int64; raise ValueError if a line has less than 2 columns.
+    """
+
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            chunk = array("q")
+            for line in iter(mm.readline, b""):
+                fields = line.replace(b",", b" ").split()
+                if not fields or fields[0][:1] in (b"#", b"%"):
+                    continue
+                if len(fields) < 2:
+                    raise ValueError(f"Invalid edge: {line!r}.")
+                chunk.append(int(fields[0]))
+                chunk.append(int(fields[1]))
+                if len(chunk) == 2 * chunk_edges:
+                    yield chunk
+                    chunk = array("q")
+            if chunk:
+                yield chunk
+
+
+def load_edges(ds: Any, chunks: Iterable[array], add_elements: bool = True) -> EdgeLoadStats:
+    """
+    Merge the partitions of the endpoints of every edge. Works with every disjoint set with add and merge; merge_many is
+    used when available (CompactDisjointSet).
+    Running time: the same of the merges, plus the adds.
+
+    Args:
+        ds: the disjoint set to fill.
+        chunks: the chunks returned by read_binary_edges or read_text_edges.
+        add_elements(optional): add the endpoints before merging. Pass False if the elements are already in the set
+            (for example a CompactDisjointSet built with of_size), to skip a lookup per endpoint.
+    Return:
+        the stats of the load, with the throughput in edges per second.
+    """
+
+    stats = EdgeLoadStats()
+    merge_many = getattr(ds, "merge_many", None)
+    start = time.perf_counter()
+
+    for chunk in chunks:
+        if add_elements:
+            for elem in chunk:
+                ds.add(elem)
+
+        pairs = zip(chunk[0::2], chunk[1::2])
+        if merge_many is not None:
+            stats.merges += merge_many(pairs)
+        else:
+            for u, v in pairs:
+                stats.merges += ds.merge(u, v)
+        stats.edges += len(chunk) // 2
+
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -3,6 +3,7 @@ from typing import Any, Optional, Callable
 from collections import deque
 from graphviz import Digraph
 from dheap import DHeap
+from disjointsets import CompactDisjointSet
 
 # This file implements a SIMPLE graph, used only for education purpose.
 
@@ -96,7 +97,7 @@ class Graph:
 
     def dijkstra(self, start_node: Node, 
                  goal_func: Callable[[Node], bool] = None) -> tuple[Optional[Node], dict[Node, Optional[Node]]]:
-        queue = DHeap(comparator="min")
+        queue = DHeap(comparator="min", indexed=True)
         distances: dict[Node, float] = dict()
         parents: dict[Node, Optional[Node]] = dict()
         for node in self.nodes:
@@ -125,7 +126,7 @@ class Graph:
                  goal_func: Callable[[Node], bool],
                  distance: Callable[[Edge], float],
                  heuristic: Callable[[Node], float]) -> tuple[Optional[Node], dict[Node, Optional[Node]]]:
-        queue = DHeap(comparator="min")
+        queue = DHeap(comparator="min", indexed=True)
         distances: dict[Node, float] = {}
         parents: dict[Node, Optional[Node]] = {}
         fscore: dict[Node, float] = {} # sum of distance and heuristic, used as priority in the queue
@@ -155,6 +156,79 @@ class Graph:
         return (None, parents)
 
 
+    def minimum_spanning_tree(self, algorithm: str = "kruskal") -> tuple[list[Edge], float]:
+        """
+        Compute the minimum spanning tree (a forest if the graph is not connected), treating every edge as undirected.
+        kruskal sorts the edges by weight and merges the partitions of the endpoints in a CompactDisjointSet over the indices 
+        of the nodes: O(E * log(E)). prim grows the tree from a node with an indexed DHeap of the nodes outside the tree, 
+        keyed by the lightest edge that reaches them: O(E * log(V)).
+        Return:
+            the edges of the tree and their total weight.
+        """
+        if algorithm == "kruskal":
+            tree = self.__kruskal()
+        elif algorithm == "prim":
+            tree = self.__prim()
+        else:
+            raise ValueError(f"Unknown algorithm {algorithm}, use 'kruskal' or 'prim'.")
+        return (tree, sum(e.value for e in tree))
+
+
+    def __kruskal(self) -> list[Edge]:
+        index = {node: i for i, node in enumerate(self.nodes)}
+        partitions = CompactDisjointSet.of_size(len(self.nodes))
+        edges: list[Edge] = []
+        sources: list[int] = []
+        dests: list[int] = []
+        weights: list[int] = []
+        for source, node in enumerate(self.nodes):
+            for e in self.edges[node]:
+                edges.append(e)
+                sources.append(source)
+                dests.append(index[e.dest])
+                weights.append(e.value)
+
+        #Sort the positions of the edges (argsort) instead of the edges, so the key is a plain list access.
+        tree: list[Edge] = []
+        for i in sorted(range(len(edges)), key=weights.__getitem__):
+            if partitions.merge(sources[i], dests[i]):
+                tree.append(edges[i])
+                if len(tree) == len(self.nodes) - 1:
+                    break
+        return tree
+
+
+    def __prim(self) -> list[Edge]:
+        neighbours: dict[Node, list[tuple[Edge, Node]]] = {node: [] for node in self.nodes}
+        for node in self.nodes:
+            for e in self.edges[node]:
+                neighbours[e.source].append((e, e.dest))
+                neighbours[e.dest].append((e, e.source))
+
+        queue = DHeap(comparator="min", indexed=True)
+        weights: dict[Node, float] = {}
+        lightest: dict[Node, Optional[Edge]] = {}
+        for node in self.nodes:
+            weights[node] = float("inf")
+            lightest[node] = None
+            queue.insert(node, float("inf"))
+
+        tree: list[Edge] = []
+        while queue:
+            u = queue.top()
+            #A node reached by no edge starts the tree of a new component.
+            if lightest[u] is not None:
+                tree.append(lightest[u])
+            weights[u] = None
+
+            for e, v in neighbours[u]:
+                if weights[v] is not None and e.value < weights[v]:
+                    weights[v] = e.value
+                    lightest[v] = e
+                    queue.update(v, e.value)
+        return tree
+
+
     def get_node(self, value: Any) -> Optional[Node]:
         for node in self.nodes:
             if node.value == value:
@@ -0,0 +1,80 @@
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Any, Iterable, Iterator, Optional
+
+from datastructures.disjointsets import CompactDisjointSet
+
+#Build the partitions of a large stream of pairs (for example the edges of a graph) with a pool of processes.
+#The stream is split in shards; every worker builds a local union-find of its shard and returns only a forest that has the 
+#same connectivity (every element linked to its local root), which is much smaller than the shard when the elements repeat.
+#The forests are then merged into a global CompactDisjointSet by the main process.
+
+
+def _shards(pairs: Iterable[tuple[Any, Any]], shard_size: int) -> Iterator[list[tuple[Any, Any]]]:
+    """
+    Split the stream of pairs in lists of at most shard_size pairs, without materializing the whole stream.
+    """
+    iterator = iter(pairs)
+    while True:
+        shard = list(itertools.islice(iterator, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def _shard_forest(shard: list[tuple[Any, Any]]) -> list[tuple[Any, Any]]:
+    """
+    Executed by a worker: build the partitions of a shard.
+    Return:
+        a pair (element, root of the element) for every element of the shard.
+    """
+    elements = list(dict.fromkeys(itertools.chain.from_iterable(shard)))
+    ds = CompactDisjointSet(elements)
+    ds.merge_many(shard)
+    return list(zip(elements, ds.find_many(elements)))
+
+
+def parallel_merge_many(pairs: Iterable[tuple[Any, Any]], workers: Optional[int] = None, 
+                        shard_size: int = 100000) -> CompactDisjointSet:
+    """
+    Build a disjoint set where the 2 elements of every pair are in the same partition, using a pool of processes.
+    The elements must be hashable and picklable.
+
+    Args:
+        pairs: the stream of pairs (any iterable of 2 elements sequences).
+        workers(optional): number of processes (by default the number of cpus). With 1 worker the shards are processed 
+            by the calling process, without the pool.
+        shard_size(optional): number of pairs sent to a worker at a time. At most 2 * workers shards are in flight.
+    Return:
+        the disjoint set with all the elements of the pairs.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    result = CompactDisjointSet()
+
+    def merge_forest(forest: list[tuple[Any, Any]]) -> None:
+        for elem, root in forest:
+            result.add(elem)
+            result.add(root)
+        result.merge_many(forest)
+
+    if workers == 1:
+        for shard in _shards(pairs, shard_size):
+            merge_forest(_shard_forest(shard))
+        return result
+
+    #Executor.map would submit all the shards at once: keep only a few of them in flight, so the stream is read while the
+    #workers process it and at most 2 * workers shards are in memory.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for shard in _shards(pairs, shard_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge_forest(future.result())
+            pending.add(pool.submit(_shard_forest, shard))
+
+        for future in as_completed(pending):
+            merge_forest(future.result())
+    return result
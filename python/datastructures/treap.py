@@ -1,21 +1,51 @@
+import gc
+import itertools
+import math
+import operator
+import random
 from dataclasses import dataclass
 
-from typing import Any, Optional, Callable
+from typing import Any, Optional, Callable, Iterable, Iterator
 
-@dataclass
+@dataclass(frozen=True)
+class Monoid:
+    """
+    An associative operation with an identity element, used by Treap to keep an aggregate of every subtree.
+    identity: the aggregate of an empty subtree.
+    combine: the associative operation; combine(a, b) is the aggregate of a range followed by the range of b.
+    lift: maps the key and the value of a node to its aggregate (by default the value).
+    """
+    identity: Any
+    combine: Callable[[Any, Any], Any]
+    lift: Callable[[Any, Any], Any] = lambda key, value: value
+
+
+SUM = Monoid(0, operator.add)
+MIN = Monoid(math.inf, min)
+MAX = Monoid(-math.inf, max)
+COUNT = Monoid(0, operator.add, lambda key, value: 1)
+
+
+@dataclass(slots=True)
 class Node:
     """
-    A node class for Treap data structure.
+    A node class for Treap data structure. The fields are stored in slots instead of a __dict__, to save memory on large treaps.
     key: an object that can be compared with other objects of the same type.
     priority: a number that describe the priority of the key.
+    value(optional): data associated to the key, used by the aggregates.
     left, right, parent: objects of class Node. They can also be None.
+    size: number of nodes in the subtree rooted at the node.
+    aggregate: the combination with the monoid of the treap of the nodes in the subtree, in order (None without monoid).
     """
 
     key: Any
     priority: float
+    value: Any = None
     _parent: Optional["Node"] = None
     _left: Optional["Node"] = None
     _right: Optional["Node"] = None
+    _size: int = 1
+    _aggregate: Any = None
 
 
     def set_left(self, node: Optional["Node"]) -> None:
@@ -50,6 +80,10 @@ class Node:
         return ret
 
 
+def _subtree_size(node: Optional[Node]) -> int:
+    return node._size if node is not None else 0
+
+
 class Treap:
     """
     A treap is a data structure that unites the concept of heap and balanced tree. It keeps keys and priorities.
@@ -57,19 +91,25 @@ class Treap:
     1) Every left subtree of a node N has key valus less than N.key (for the right subtree is greater).
     2) Given a node N, the priority of N is greater than the subtree rooted at N. 
     3) Each node has at most 2 children.
+    Every node also keeps the size of its subtree, updated by the rotations, so the treap can be split and joined in O(log(N))
+    and it can answer order statistics (select, rank, count_range) in O(log(N)). With a monoid (for example SUM of the values),
+    every node keeps the aggregate of its subtree in the same way and aggregate answers range queries in O(log(N)).
     """
 
 
-    def __init__(self, heap_comparator: str = "max"):
+    def __init__(self, heap_comparator: str = "max", monoid: Optional[Monoid] = None):
         """
         Args:
             heap_comparator: 'max' for a max heap, 'min' for a min heap. 
             Note: if comparator(x, y) is true it means that x has "higher" priority than y, where "higher" means that x is more important
             than y. 
+            monoid(optional): the aggregate kept in every subtree (SUM, MIN, MAX, COUNT or a custom Monoid).
         """
 
         self._root = None
         self._comparator: Callable[[int, int], bool] = None
+        self._comparator_kind = heap_comparator
+        self._monoid = monoid
         self.size = 0
         if heap_comparator == "max":
             self._comparator = lambda x, y: x > y
@@ -78,9 +118,66 @@ class Treap:
         else:
             raise ValueError("The comparator should be 'max' or 'min'.")
 
+    @classmethod
+    def from_sorted(cls, keys: list[Any], priorities: list[float], heap_comparator: str = "max", 
+                    values: Optional[list[Any]] = None, monoid: Optional[Monoid] = None) -> "Treap":
+        """
+        Build a treap from keys sorted in non decreasing order, without rotations: the treap is built as a Cartesian tree
+        keeping its right spine in a stack.
+        Running time: O(N).
+
+        Args:
+            keys: list of sorted keys.
+            priorities: list of priorities. Note that priorities[i] should correspond to the priority of keys[i].
+            heap_comparator(optional): 'max' or 'min', as in the constructor.
+            values(optional): list of values, values[i] is associated to keys[i].
+            monoid(optional): the aggregate, as in the constructor.
+        Return:
+            the new treap, or raise ValueError if the keys are not sorted.
+        """
+
+        assert(len(keys) == len(priorities))
+        if values is None:
+            values = itertools.repeat(None)
+        else:
+            assert(len(keys) == len(values))
+
+        if any(k2 < k1 for k1, k2 in itertools.pairwise(keys)):
+            raise ValueError("The keys are not sorted.")
+
+        treap = cls(heap_comparator, monoid)
+        treap.__set_root(treap.__build_sorted(zip(keys, priorities, values)))
+        return treap
+
+
+    @classmethod
+    def from_unsorted(cls, keys: Iterable[Any], priorities: Iterable[float], heap_comparator: str = "max",
+                      values: Optional[Iterable[Any]] = None, monoid: Optional[Monoid] = None) -> "Treap":
+        """
+        Build a treap from keys in any order, sorting the pairs (key, priority) by key and building the treap as in from_sorted.
+        Running time: O(N * log(N) base 2) for the sort, O(N) for the build.
+
+        Args:
+            keys: iterable of keys.
+            priorities: iterable of priorities, in the same order of the keys.
+            heap_comparator(optional): 'max' or 'min', as in the constructor.
+            values(optional): iterable of values, in the same order of the keys.
+            monoid(optional): the aggregate, as in the constructor.
+        Return:
+            the new treap.
+        """
+
+        if values is None:
+            triples = zip(keys, priorities, itertools.repeat(None))
+        else:
+            triples = zip(keys, priorities, values, strict=True)
+        treap = cls(heap_comparator, monoid)
+        treap.__set_root(treap.__build_sorted(sorted(triples, key=lambda triple: triple[0])))
+        return treap
+
     # ******************************* PUBLIC INTERFACE *****************************************
 
-    def insert(self, key: Any, priority: int) -> None:
+    def insert(self, key: Any, priority: int, value: Any = None) -> None:
         """
         Insert a node respecting the BST invariant and then rotate to adjust the heap invariant.
         Running time: O(log(N) base 2).
@@ -88,16 +185,19 @@ class Treap:
         Args:
             key: Key to insert. (Should be of the same type of the other keys and should provide a comparator method)
             priority: priority associated to the key.
+            value(optional): value associated to the key.
         """
 
         node: Node = self._root
         parent: Node = None
-        new_node = Node(key, priority)
+        new_node = Node(key, priority, value)
+        self.__pull(new_node)
         self.size += 1
 
         #First we go through the whole tree to search the right place of the node based on the key.
         while node is not None:
             parent = node
+            node._size += 1
             if key <= node.key:
                 node = node._left
             else:
@@ -120,6 +220,13 @@ class Treap:
 
         if new_node._parent is None:
             self._root = new_node
+
+        #The sizes of the ancestors are already incremented, but their aggregates must include the new value.
+        if self._monoid is not None:
+            node = new_node._parent
+            while node is not None:
+                self.__pull(node)
+                node = node._parent
         
 
     def remove(self, key) -> bool:
@@ -155,10 +262,15 @@ class Treap:
                 self._root = node._parent
 
         #Remove the node.
-        if node._parent._left is node:
-            node._parent._left = None
+        parent = node._parent
+        if parent._left is node:
+            parent._left = None
         else:
-            node._parent._right = None
+            parent._right = None
+
+        while parent is not None:
+            self.__pull(parent)
+            parent = parent._parent
         return True
 
 
@@ -191,7 +303,7 @@ class Treap:
 
     def search(self, node: Node, target_key: Any) -> Optional[Node]:
         """
-        Search the target key starting from a node.
+        Search the target key starting from a node, with a loop instead of a call per level.
         Running time: O(log(N) base 2).
 
         Args:
@@ -200,16 +312,13 @@ class Treap:
         Return:
             return the node if the target_key is present, else None.
         """
-        
-        if node is None:
-            return None
-        
-        if node.key is target_key:
-            return node
-        elif target_key < node.key:
-            return self.search(node._left, target_key)
-        else:
-            return self.search(node._right, target_key)
+
+        while node is not None:
+            key = node.key
+            if key == target_key:
+                return node
+            node = node._left if target_key < key else node._right
+        return None
         
     
     def contains(self, key: Any) -> bool:
@@ -265,6 +374,181 @@ class Treap:
         return True
 
 
+    def split(self, key: Any) -> "Treap":
+        """
+        Split the treap: the keys less than key stay in this treap, the others are moved in a new treap.
+        Running time: O(log(N) base 2).
+
+        Args:
+            key: the smallest key of the new treap.
+        Return:
+            a treap with the same comparator and the keys greater or equal than key.
+        """
+
+        left, right = self.__split_nodes(self._root, key, False)
+        self.__set_root(left)
+
+        other = Treap(self._comparator_kind, self._monoid)
+        other.__set_root(right)
+        return other
+
+
+    def join(self, other: "Treap") -> None:
+        """
+        Move all the keys of another treap in this one. The keys of other must be greater or equal than the keys of this treap
+        (for example the treap returned by split) and the treaps must have the same comparator. After the join other is empty.
+        Running time: O(log(N + M) base 2) where M is the size of the other treap.
+
+        Args:
+            other: the treap to join.
+        """
+
+        if other is self:
+            raise ValueError("A treap can't be joined with itself.")
+        if self._comparator_kind != other._comparator_kind:
+            raise ValueError("The treaps must have the same comparator.")
+        if self._monoid is not other._monoid:
+            raise ValueError("The treaps must have the same monoid.")
+        if not self.empty() and not other.empty() and other.min() < self.max():
+            raise ValueError("The keys of the other treap must be greater or equal than the keys of this treap.")
+
+        self.__set_root(self.__join_nodes(self._root, other._root))
+        other.__set_root(None)
+
+
+    def insert_many(self, keys: list[Any], priorities: list[float], values: Optional[list[Any]] = None) -> None:
+        """
+        Insert a batch of keys. The batch is sorted and built as a treap in linear time, then it's united with this treap 
+        by splitting it at the roots of the batch.
+        Running time: O(M * log(N / M + 1) base 2) plus the sort of the batch, where M is the size of the batch.
+
+        Args:
+            keys: list of keys to insert.
+            priorities: list of priorities. Note that priorities[i] should correspond to the priority of keys[i].
+            values(optional): list of values, values[i] is associated to keys[i].
+        """
+
+        assert(len(keys) == len(priorities))
+        if values is None:
+            values = itertools.repeat(None)
+        else:
+            assert(len(keys) == len(values))
+
+        batch = self.__build_sorted(sorted(zip(keys, priorities, values), key=lambda triple: triple[0]))
+        self.__set_root(self.__union_nodes(self._root, batch))
+
+
+    def remove_range(self, lo: Any, hi: Any) -> int:
+        """
+        Remove all the keys k such that lo <= k <= hi, with 2 splits and a join.
+        Running time: O(log(N) base 2).
+
+        Return:
+            the number of removed keys.
+        """
+
+        left, rest = self.__split_nodes(self._root, lo, False)
+        removed, right = self.__split_nodes(rest, hi, True)
+        self.__set_root(self.__join_nodes(left, right))
+        return _subtree_size(removed)
+
+
+    def select(self, k: int) -> Any:
+        """
+        Return the k-th smallest key (k = 0 is the min), going down from the root with the sizes of the subtrees.
+        Running time: O(log(N) base 2).
+
+        Args:
+            k: position of the key in sorted order; a negative k counts from the end, as for a list.
+        Return:
+            the key, or raise IndexError if k is out of range.
+        """
+
+        if k < 0:
+            k += self.size
+        if not 0 <= k < self.size:
+            raise IndexError("The position is out of range.")
+
+        node = self._root
+        while True:
+            left_size = _subtree_size(node._left)
+            if k < left_size:
+                node = node._left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node._right
+
+
+    def rank(self, key: Any) -> int:
+        """
+        Return the number of keys less than key (the position of key in sorted order, if present).
+        Running time: O(log(N) base 2).
+        """
+        return self.__count_less(key, False)
+
+
+    def count_range(self, lo: Any, hi: Any) -> int:
+        """
+        Return the number of keys k such that lo <= k <= hi.
+        Running time: O(log(N) base 2).
+        """
+        if hi < lo:
+            return 0
+        return self.__count_less(hi, True) - self.__count_less(lo, False)
+
+
+    def aggregate(self, lo: Any, hi: Any) -> Any:
+        """
+        Combine with the monoid of the treap the nodes with lo <= key <= hi, in order of key. Below the node where the paths 
+        to lo and hi split, every subtree entirely in the range contributes its stored aggregate.
+        Running time: O(log(N) base 2).
+
+        Return:
+            the aggregate (the identity of the monoid if the range is empty), or raise ValueError if the treap has no monoid.
+        """
+
+        monoid = self._monoid
+        if monoid is None:
+            raise ValueError("The treap has no monoid.")
+
+        #Find the highest node in the range: the ranges of its left and right subtrees are bounded only by lo and hi.
+        node = self._root
+        while node is not None and not (lo <= node.key <= hi):
+            node = node._right if node.key < lo else node._left
+        if node is None:
+            return monoid.identity
+
+        #The keys >= lo in the left subtree. The parts are found from the last to the first in order.
+        left_parts = []
+        child = node._left
+        while child is not None:
+            if child.key < lo:
+                child = child._right
+            else:
+                left_parts.append(self.__combine(monoid.lift(child.key, child.value), child._right))
+                child = child._left
+
+        #The keys <= hi in the right subtree, found in order.
+        right_parts = []
+        child = node._right
+        while child is not None:
+            if hi < child.key:
+                child = child._left
+            else:
+                right_parts.append(self.__combine_left(child._left, monoid.lift(child.key, child.value)))
+                child = child._right
+
+        result = monoid.identity
+        for part in reversed(left_parts):
+            result = monoid.combine(result, part)
+        result = monoid.combine(result, monoid.lift(node.key, node.value))
+        for part in right_parts:
+            result = monoid.combine(result, part)
+        return result
+
+
     def empty(self) -> bool:
         return self._root is None
 
@@ -297,6 +581,34 @@ class Treap:
         return node.key
 
 
+    def irange(self, lo: Any = None, hi: Any = None, reverse: bool = False) -> Iterator[Any]:
+        """
+        Iterate lazily the keys k such that lo <= k <= hi, in sorted order (descending if reverse). The subtrees out of the 
+        range are skipped and the path to the current key is kept in an explicit stack. The treap should not be modified 
+        during the iteration.
+        Running time: O(log(N) base 2 + K) where K is the number of keys in the range.
+
+        Args:
+            lo(optional): lower bound, None for no bound.
+            hi(optional): upper bound, None for no bound.
+            reverse(optional): iterate from the greatest key.
+        """
+        return (node.key for node in self.__walk(lo, hi, reverse))
+
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        """
+        Iterate lazily the pairs (key, value) in sorted order of the keys, as dict.items does (the priorities are only used
+        to balance the treap; the value is None for the keys inserted without one).
+        Running time: O(N).
+        """
+        return ((node.key, node.value) for node in self.__walk(None, None, False))
+
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.irange()
+
+
     def __len__(self):
         return self.size
 
@@ -324,6 +636,8 @@ class Treap:
 
         y.set_left(x._right)
         x.set_right(y)
+        self.__pull(y)
+        self.__pull(x)
 
         return x
 
@@ -348,10 +662,241 @@ class Treap:
 
         y.set_right(x._left)
         x.set_left(y)
+        self.__pull(y)
+        self.__pull(x)
 
         return x
 
 
+    def __pull(self, node: Node) -> None:
+        """
+        Recompute the size (and the aggregate, if the treap has a monoid) of the subtree of the node from its children.
+        """
+        node._size = 1 + _subtree_size(node._left) + _subtree_size(node._right)
+        if self._monoid is not None:
+            node._aggregate = self.__combine_left(node._left, self.__combine(self._monoid.lift(node.key, node.value), node._right))
+
+
+    def __combine(self, part: Any, node: Optional[Node]) -> Any:
+        """
+        Return the combination of part followed by the aggregate of the subtree rooted at node.
+        """
+        return part if node is None else self._monoid.combine(part, node._aggregate)
+
+
+    def __combine_left(self, node: Optional[Node], part: Any) -> Any:
+        """
+        Return the combination of the aggregate of the subtree rooted at node followed by part.
+        """
+        return part if node is None else self._monoid.combine(node._aggregate, part)
+
+
+    def __set_root(self, node: Optional[Node]) -> None:
+        self._root = node
+        if node is not None:
+            node._parent = None
+        self.size = _subtree_size(node)
+
+
+    def __count_less(self, key: Any, inclusive: bool) -> int:
+        """
+        Count the keys less than key (less or equal if inclusive), adding the size of the left subtree of every node of 
+        the path that is less than key.
+        """
+
+        count = 0
+        node = self._root
+        while node is not None:
+            if node.key < key or (inclusive and node.key == key):
+                count += _subtree_size(node._left) + 1
+                node = node._right
+            else:
+                node = node._left
+        return count
+
+
+    def __walk(self, lo: Any, hi: Any, reverse: bool) -> Iterator[Node]:
+        """
+        In order visit of the nodes with lo <= key <= hi (None means no bound), from the greatest key if reverse.
+        """
+
+        #first_bound is the bound where the visit starts, last_bound where it stops.
+        first_bound, last_bound = (hi, lo) if reverse else (lo, hi)
+        stack: list[Node] = []
+        node = self._root
+
+        while True:
+            #Go down towards the first key, skipping the nodes (and their subtrees on the same side) before the first bound.
+            while node is not None:
+                if first_bound is not None and (first_bound < node.key if reverse else node.key < first_bound):
+                    node = node._left if reverse else node._right
+                else:
+                    stack.append(node)
+                    node = node._right if reverse else node._left
+
+            if not stack:
+                return
+            node = stack.pop()
+            if last_bound is not None and (node.key < last_bound if reverse else last_bound < node.key):
+                return
+            yield node
+            node = node._left if reverse else node._right
+
+
+    def __split_nodes(self, node: Optional[Node], key: Any, inclusive: bool) -> tuple[Optional[Node], Optional[Node]]:
+        """
+        Split the subtree rooted at node in 2 subtrees: the keys less than key (less or equal if inclusive) and the others.
+        The walk goes down a single path: every node of the left subtree found on the path becomes the right child of the 
+        previous one and vice versa, so only the nodes on the path change.
+        Return:
+            the roots of the 2 subtrees (their parents are not updated).
+        """
+
+        left_root = right_root = None
+        #The last node attached to the left (right) subtree, whose right (left) child is still to decide.
+        left_last = right_last = None
+        path: list[Node] = []
+
+        while node is not None:
+            path.append(node)
+            if node.key < key or (inclusive and node.key == key):
+                if left_last is None:
+                    left_root = node
+                else:
+                    left_last.set_right(node)
+                left_last = node
+                node = node._right
+            else:
+                if right_last is None:
+                    right_root = node
+                else:
+                    right_last.set_left(node)
+                right_last = node
+                node = node._left
+
+        if left_last is not None:
+            left_last._right = None
+        if right_last is not None:
+            right_last._left = None
+
+        #The children of a node on the path are deeper on the path or untouched subtrees.
+        for node in reversed(path):
+            self.__pull(node)
+        return left_root, right_root
+
+
+    def __join_nodes(self, left: Optional[Node], right: Optional[Node]) -> Optional[Node]:
+        """
+        Join 2 subtrees, where the keys of left are less or equal than the keys of right, walking down the right spine of 
+        left and the left spine of right and taking at every step the node with the higher priority.
+        Return:
+            the root of the joined subtree (its parent is not updated).
+        """
+
+        root = None
+        #The last node attached and the side where the next one goes: the right child of a node of left, the left child of a 
+        #node of right.
+        last = None
+        attach_right = True
+        path: list[Node] = []
+
+        while left is not None and right is not None:
+            from_left = self._comparator(left.priority, right.priority)
+            if from_left:
+                node = left
+                left = left._right
+            else:
+                node = right
+                right = right._left
+
+            if last is None:
+                root = node
+            elif attach_right:
+                last.set_right(node)
+            else:
+                last.set_left(node)
+            last = node
+            attach_right = from_left
+            path.append(node)
+
+        rest = left if left is not None else right
+        if last is None:
+            return rest
+        if attach_right:
+            last.set_right(rest)
+        else:
+            last.set_left(rest)
+
+        for node in reversed(path):
+            self.__pull(node)
+        return root
+
+
+    def __union_nodes(self, a: Optional[Node], b: Optional[Node]) -> Optional[Node]:
+        """
+        Unite 2 subtrees with any keys: the root with the higher priority stays the root and the other subtree is split 
+        at its key and united with its children.
+        Return:
+            the root of the united subtree (its parent is not updated).
+        """
+
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if self._comparator(b.priority, a.priority):
+            a, b = b, a
+
+        left, right = self.__split_nodes(b, a.key, False)
+        a.set_left(self.__union_nodes(a._left, left))
+        a.set_right(self.__union_nodes(a._right, right))
+        self.__pull(a)
+        return a
+
+
+    def __build_sorted(self, triples: Iterable[tuple[Any, float, Any]]) -> Optional[Node]:
+        """
+        Build a treap from the triples (key, priority, value) sorted by key, as a Cartesian tree: the right spine of the tree built so 
+        far is kept in a stack and every new node pops the nodes with lower priority, that become its left subtree. Every 
+        node is pushed and popped once.
+        Running time: O(M).
+        Return:
+            the root of the new subtree.
+        """
+
+        #The build allocates a node per key and frees nothing: pause the cyclic garbage collector, that would otherwise 
+        #traverse all the nodes (linked in cycles through the parents) many times during a large build.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            higher = self._comparator
+            pull = self.__pull
+            stack: list[Node] = []
+            for key, priority, value in triples:
+                node = Node(key, priority, value)
+                last = None
+                while stack and higher(priority, stack[-1].priority):
+                    #The subtree of a popped node is complete: its right child was popped just before it.
+                    last = stack.pop()
+                    pull(last)
+                if last is not None:
+                    node._left = last
+                    last._parent = node
+                if stack:
+                    stack[-1]._right = node
+                    node._parent = stack[-1]
+                stack.append(node)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        root = None
+        while stack:
+            root = stack.pop()
+            pull(root)
+        return root
+
+
     def _validate(self):
         """
         Validate the treap. Check:
@@ -372,6 +917,17 @@ class Treap:
                 
                 tree_walk(node._left)
 
+            if node._size != 1 + _subtree_size(node._left) + _subtree_size(node._right):
+                print(f"Violation of size invariant node {node}")
+                return
+
+            if self._monoid is not None:
+                aggregate = node._aggregate
+                self.__pull(node)
+                if aggregate != node._aggregate:
+                    print(f"Violation of aggregate invariant node {node}")
+                    return
+
             if node._right is not None:
                 if node.key > node._right.key:
                     print(f"Violation of key invariant node right {node}")
@@ -384,3 +940,325 @@ class Treap:
 
 
         tree_walk(self._root)
+
+
+
+@dataclass(slots=True)
+class ImplicitNode:
+    """
+    A node class for ImplicitTreap. The position of the value is not stored: it's the number of nodes that come before it
+    in order, computed from the sizes of the subtrees.
+    value: the element of the sequence.
+    priority: a random number, the treap is a max heap on the priorities.
+    reversed: true if the subtree must be mirrored (a reverse not yet pushed down to the children).
+    """
+
+    value: Any
+    priority: float
+    _left: Optional["ImplicitNode"] = None
+    _right: Optional["ImplicitNode"] = None
+    _size: int = 1
+    _reversed: bool = False
+
+
+    def push(self) -> None:
+        """
+        Apply a pending reverse: swap the children and pass the reverse to them.
+        """
+        if self._reversed:
+            self._left, self._right = self._right, self._left
+            if self._left is not None:
+                self._left._reversed = not self._left._reversed
+            if self._right is not None:
+                self._right._reversed = not self._right._reversed
+            self._reversed = False
+
+
+    def pull(self) -> None:
+        """
+        Recompute the size of the subtree from the children.
+        """
+        self._size = 1 + _subtree_size(self._left) + _subtree_size(self._right)
+
+
+class ImplicitTreap:
+    """
+    A treap where the key of a node is its position in the sequence (implicit key), also known as rope: it keeps a sequence
+    of values that can be edited by position in O(log(N)) expected time, because every operation is a split of the treap 
+    at a position and a join of the pieces. A range of positions can be reversed in O(log(N)) too, marking the root of the
+    range as reversed; the mark is pushed down to the children only when a node is visited.
+    The priorities are random numbers, so the treap is balanced with high probability.
+    """
+
+    def __init__(self, values: Iterable[Any] = ()):
+        """
+        Running time: O(N) where N is the number of values.
+        Args:
+            values(optional): the initial sequence.
+        """
+        self._root: Optional[ImplicitNode] = self.__build(values)
+
+    # ******************************* PUBLIC INTERFACE *****************************************
+
+    def insert_at(self, i: int, value: Any) -> None:
+        """
+        Insert a value before the position i (at the end if i is the length of the sequence).
+        Running time: O(log(N) base 2).
+
+        Args:
+            i: position of the new value; a negative i counts from the end, as for list.insert.
+            value: value to insert.
+        """
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i <= len(self):
+            raise IndexError("The position is out of range.")
+        left, right = self.__split(self._root, i)
+        self._root = self.__join(self.__join(left, ImplicitNode(value, random.random())), right)
+
+
+    def delete_at(self, i: int) -> Any:
+        """
+        Remove the value at position i.
+        Running time: O(log(N) base 2).
+
+        Args:
+            i: position of the value; a negative i counts from the end, as for a list.
+        Return:
+            the removed value.
+        """
+
+        i = self.__position(i, len(self))
+        left, right = self.__split(self._root, i)
+        node, right = self.__split(right, 1)
+        self._root = self.__join(left, right)
+        return node.value
+
+
+    def slice(self, i: Optional[int] = None, j: Optional[int] = None) -> "ImplicitTreap":
+        """
+        Return a new treap with a copy of the values in the positions [i, j). The bounds work as in a list slice.
+        Running time: O(log(N) base 2 + K) where K is the number of copied values.
+        """
+
+        i, j, _ = slice(i, j).indices(len(self))
+        left, middle, right = self.__cut(i, j)
+        copy = ImplicitTreap(node.value for node in self.__walk(middle))
+        self._root = self.__join(self.__join(left, middle), right)
+        return copy
+
+
+    def concat(self, other: "ImplicitTreap") -> None:
+        """
+        Append the values of another treap at the end of this one. After the concat other is empty.
+        Running time: O(log(N + M) base 2) where M is the length of the other treap.
+        """
+
+        if other is self:
+            raise ValueError("A treap can't be concatenated with itself.")
+
+        self._root = self.__join(self._root, other._root)
+        other._root = None
+
+
+    def reverse(self, i: Optional[int] = None, j: Optional[int] = None) -> None:
+        """
+        Reverse the values in the positions [i, j) (all the sequence by default). The bounds work as in a list slice.
+        Running time: O(log(N) base 2).
+        """
+
+        i, j, _ = slice(i, j).indices(len(self))
+        left, middle, right = self.__cut(i, j)
+        if middle is not None:
+            middle._reversed = not middle._reversed
+        self._root = self.__join(self.__join(left, middle), right)
+
+
+    def __getitem__(self, i: int) -> Any:
+        """
+        Return the value at position i.
+        Running time: O(log(N) base 2).
+        """
+
+        i = self.__position(i, len(self))
+        node = self._root
+        while True:
+            node.push()
+            left_size = _subtree_size(node._left)
+            if i < left_size:
+                node = node._left
+            elif i == left_size:
+                return node.value
+            else:
+                i -= left_size + 1
+                node = node._right
+
+
+    def __iter__(self) -> Iterator[Any]:
+        return (node.value for node in self.__walk(self._root))
+
+
+    def __len__(self):
+        return _subtree_size(self._root)
+
+    # ******************************* END PUBLIC INTERFACE *****************************************
+
+
+    @staticmethod
+    def __position(i: int, length: int) -> int:
+        if i < 0:
+            i += length
+        if not 0 <= i < length:
+            raise IndexError("The position is out of range.")
+        return i
+
+
+    @staticmethod
+    def __build(values: Iterable[Any]) -> Optional[ImplicitNode]:
+        """
+        Build the treap of a sequence as a Cartesian tree, as Treap.from_sorted does (the positions are already sorted).
+        """
+
+        #See Treap.__build_sorted.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            stack: list[ImplicitNode] = []
+            for value in values:
+                node = ImplicitNode(value, random.random())
+                last = None
+                while stack and node.priority > stack[-1].priority:
+                    last = stack.pop()
+                    last.pull()
+                node._left = last
+                if stack:
+                    stack[-1]._right = node
+                stack.append(node)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        root = None
+        while stack:
+            root = stack.pop()
+            root.pull()
+        return root
+
+
+    def __cut(self, i: int, j: int) -> tuple[Optional[ImplicitNode], Optional[ImplicitNode], Optional[ImplicitNode]]:
+        """
+        Split the treap in 3 subtrees: the positions before i, the positions [i, j) and the positions from j.
+        """
+        left, rest = self.__split(self._root, i)
+        middle, right = self.__split(rest, max(j - i, 0))
+        return left, middle, right
+
+
+    @staticmethod
+    def __split(node: Optional[ImplicitNode], k: int) -> tuple[Optional[ImplicitNode], Optional[ImplicitNode]]:
+        """
+        Split the subtree rooted at node in the first k values and the others, walking down a single path (see 
+        Treap.__split_nodes).
+        Return:
+            the roots of the 2 subtrees.
+        """
+
+        left_root = right_root = None
+        left_last = right_last = None
+        path: list[ImplicitNode] = []
+
+        while node is not None:
+            node.push()
+            path.append(node)
+            left_size = _subtree_size(node._left)
+            if left_size < k:
+                if left_last is None:
+                    left_root = node
+                else:
+                    left_last._right = node
+                left_last = node
+                k -= left_size + 1
+                node = node._right
+            else:
+                if right_last is None:
+                    right_root = node
+                else:
+                    right_last._left = node
+                right_last = node
+                node = node._left
+
+        if left_last is not None:
+            left_last._right = None
+        if right_last is not None:
+            right_last._left = None
+
+        for node in reversed(path):
+            node.pull()
+        return left_root, right_root
+
+
+    @staticmethod
+    def __join(left: Optional[ImplicitNode], right: Optional[ImplicitNode]) -> Optional[ImplicitNode]:
+        """
+        Join 2 subtrees, the values of left before the values of right (see Treap.__join_nodes).
+        Return:
+            the root of the joined subtree.
+        """
+
+        root = None
+        last = None
+        attach_right = True
+        path: list[ImplicitNode] = []
+
+        while left is not None and right is not None:
+            from_left = left.priority > right.priority
+            if from_left:
+                node = left
+                node.push()
+                left = node._right
+            else:
+                node = right
+                node.push()
+                right = node._left
+
+            if last is None:
+                root = node
+            elif attach_right:
+                last._right = node
+            else:
+                last._left = node
+            last = node
+            attach_right = from_left
+            path.append(node)
+
+        rest = left if left is not None else right
+        if last is None:
+            return rest
+        if attach_right:
+            last._right = rest
+        else:
+            last._left = rest
+
+        for node in reversed(path):
+            node.pull()
+        return root
+
+
+    @staticmethod
+    def __walk(node: Optional[ImplicitNode]) -> Iterator[ImplicitNode]:
+        """
+        In order visit of the subtree rooted at node with an explicit stack, pushing down the pending reverses.
+        """
+
+        stack: list[ImplicitNode] = []
+        while True:
+            while node is not None:
+                node.push()
+                stack.append(node)
+                node = node._left
+            if not stack:
+                return
+            node = stack.pop()
+            yield node
+            node = node._right
@@ -0,0 +1,94 @@
+import unittest
+import asyncio
+import threading
+import time
+
+import random
+
+from datastructures.dheap import DHeap
+from datastructures.concurrent_dheap import ConcurrentDHeap, AsyncDHeap
+
+import heap_profile
+
+#Throughput of ConcurrentDHeap and AsyncDHeap under contention: every producer inserts Items elements (one at the time with put,
+#or in batches with put_many) while the same number of consumers extract them. The output has the same format of
+#heap_profile.py: per_call_time is the time per element.
+
+
+class ProfileConcurrentHeap(unittest.TestCase):
+    BranchingFactors = [2, 4, 8]
+    Workers = [1, 2, 4, 8]
+    Items = 20000
+    BatchSize = 100
+    OutputFileName = "data/stats_concurrent_heap.csv"
+
+
+    @staticmethod
+    def run_threads(heap: ConcurrentDHeap, workers: int, batch_size: int) -> float:
+        """Run workers producers and workers consumers on the heap and return the elapsed time."""
+
+        def produce():
+            priorities = [random.randint(0, 2000) for _ in range(ProfileConcurrentHeap.Items)]
+            for i in range(0, ProfileConcurrentHeap.Items, batch_size):
+                batch = priorities[i:i + batch_size]
+                if batch_size == 1:
+                    heap.put(random.random(), batch[0])
+                else:
+                    heap.put_many([random.random() for _ in batch], batch)
+
+        def consume():
+            extracted = 0
+            while extracted < ProfileConcurrentHeap.Items:
+                extracted += len(heap.get_many(min(batch_size, ProfileConcurrentHeap.Items - extracted)))
+
+        threads = [threading.Thread(target=produce) for _ in range(workers)]
+        threads += [threading.Thread(target=consume) for _ in range(workers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start
+
+
+    @staticmethod
+    async def run_tasks(heap: AsyncDHeap, workers: int, batch_size: int) -> float:
+        """Same as run_threads, with asyncio tasks."""
+
+        async def produce():
+            priorities = [random.randint(0, 2000) for _ in range(ProfileConcurrentHeap.Items)]
+            for i in range(0, ProfileConcurrentHeap.Items, batch_size):
+                batch = priorities[i:i + batch_size]
+                await heap.put_many([random.random() for _ in batch], batch)
+                await asyncio.sleep(0)
+
+        async def consume():
+            extracted = 0
+            while extracted < ProfileConcurrentHeap.Items:
+                extracted += len(await heap.get_many(min(batch_size, ProfileConcurrentHeap.Items - extracted)))
+
+        start = time.perf_counter()
+        await asyncio.gather(*[produce() for _ in range(workers)], *[consume() for _ in range(workers)])
+        return time.perf_counter() - start
+
+
+    def test_throughput(self) -> None:
+        with open(ProfileConcurrentHeap.OutputFileName, "w") as f:
+            heap_profile.ProfileHeap.write_header(f)
+
+            for b in ProfileConcurrentHeap.BranchingFactors:
+                for workers in ProfileConcurrentHeap.Workers:
+                    elements = workers * ProfileConcurrentHeap.Items
+                    timings = [
+                        ("put", ProfileConcurrentHeap.run_threads(ConcurrentDHeap(DHeap(b)), workers, 1)),
+                        ("put_many", ProfileConcurrentHeap.run_threads(ConcurrentDHeap(DHeap(b)), workers, ProfileConcurrentHeap.BatchSize)),
+                        ("async_put_many", asyncio.run(ProfileConcurrentHeap.run_tasks(AsyncDHeap(DHeap(b)), workers, ProfileConcurrentHeap.BatchSize))),
+                    ]
+
+                    for method_name, total_time in timings:
+                        heap_profile.ProfileHeap.write_row(f, f"workers_{workers}", b, method_name, total_time, total_time, total_time / elements)
+                        print(f"branching factor {b}, {workers} producers/consumers, {method_name}: {elements / total_time:.0f} elements/s")
+
+
+if __name__ == "__main__":
+    unittest.main()
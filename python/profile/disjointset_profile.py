@@ -0,0 +1,159 @@
+import unittest
+import time
+import tracemalloc
+
+import random
+
+from datastructures.disjointsets import DisjointSetArray, DisjointSet, CompactDisjointSet, RollbackDisjointSet
+
+import heap_profile
+
+#Compare the disjoint set implementations on the same edge streams:
+#- random: pairs of elements chosen uniformly;
+#- chain: the pairs (i, i+1) in order, that build a single long partition one element at the time;
+#- binomial: the pairs (i, i+s) for s = 1, 2, 4, ..., that always merge 2 partitions of the same size: this is the worst case
+#  for union by rank (trees of depth log(n));
+#- power_law: a preferential attachment graph (every new element links to 2 endpoints of the existing edges, so a few elements
+#  have most of the edges), shuffled, as the edge lists of real networks.
+#The timings use perf_counter (see heap_comparator_profile.py) and are written in the same format of heap_profile.py, with 
+#test_case = implementation_distribution and the number of elements in the branching_factor column, so the notebooks in
+#visualization_profile can plot them. The peak memory and the depth of the trees after the merges are written in a second file.
+
+
+class ProfileDisjointSet(unittest.TestCase):
+    Sizes = [10**4, 10**5]
+    OutputFileName = "data/stats_disjointset.csv"
+    OutputFileNameShape = "data/stats_disjointset_shape.csv"
+    #test_case -> class of the implementation, built with the initial set of elements.
+    DisjointSetClasses = {
+        "array": DisjointSetArray,
+        "disjoint_set": lambda elements: DisjointSet(),
+        "compact": CompactDisjointSet,
+        "rollback": RollbackDisjointSet,
+    }
+
+
+    @staticmethod
+    def random_edges(n: int) -> list[tuple[int, int]]:
+        return [(random.randrange(n), random.randrange(n)) for _ in range(n)]
+
+
+    @staticmethod
+    def chain_edges(n: int) -> list[tuple[int, int]]:
+        return [(i, i + 1) for i in range(n - 1)]
+
+
+    @staticmethod
+    def binomial_edges(n: int) -> list[tuple[int, int]]:
+        edges = []
+        step = 1
+        while step < n:
+            edges.extend((i, i + step) for i in range(0, n - step, 2 * step))
+            step *= 2
+        return edges
+
+
+    @staticmethod
+    def power_law_edges(n: int) -> list[tuple[int, int]]:
+        edges = [(0, 1)]
+        for elem in range(2, n):
+            for _ in range(2):
+                edges.append((elem, random.choice(edges[random.randrange(len(edges))])))
+        random.shuffle(edges)
+        return edges
+
+
+    @staticmethod
+    def build(factory, elements: list[int]):
+        """Create the disjoint set with the factory and add the elements (DisjointSet has no initial set)."""
+        ds = factory(elements)
+        for elem in elements:
+            ds.add(elem)
+        return ds
+
+
+    @staticmethod
+    def forest_depths(ds) -> list[int]:
+        """Return the depth of every element in the forest (0 for the roots). The partitions of DisjointSetArray are flat."""
+        if isinstance(ds, DisjointSetArray):
+            return [0] * len(ds.partions_map)
+
+        if isinstance(ds, DisjointSet):
+            parents = {elem: info.root for elem, info in ds.parents_map.items()}
+        else:
+            parents = dict(enumerate(ds._parents))
+
+        depths = {}
+        for elem in parents:
+            path = []
+            while elem not in depths and parents[elem] != elem:
+                path.append(elem)
+                elem = parents[elem]
+            depth = depths.get(elem, 0)
+            for e in reversed(path):
+                depth += 1
+                depths[e] = depth
+            depths.setdefault(elem, 0)
+        return list(depths.values())
+
+
+    @staticmethod
+    def time_calls(method, args: list[tuple]) -> float:
+        """Call method on every tuple of arguments and return the elapsed time."""
+        start = time.perf_counter()
+        for a in args:
+            method(*a)
+        return time.perf_counter() - start
+
+
+    def test_distributions(self) -> None:
+        distributions = {
+            "random": ProfileDisjointSet.random_edges,
+            "chain": ProfileDisjointSet.chain_edges,
+            "binomial": ProfileDisjointSet.binomial_edges,
+            "power_law": ProfileDisjointSet.power_law_edges,
+        }
+
+        with open(ProfileDisjointSet.OutputFileName, "w") as f, open(ProfileDisjointSet.OutputFileNameShape, "w") as f_shape:
+            heap_profile.ProfileHeap.write_header(f)
+            f_shape.write('test_case,size,peak_bytes,max_depth,average_depth\n')
+
+            for n in ProfileDisjointSet.Sizes:
+                elements = list(range(n))
+                finds = [(random.randrange(n),) for _ in range(n)]
+                checks = [(random.randrange(n), random.randrange(n)) for _ in range(n)]
+
+                for distribution, generate in distributions.items():
+                    edges = generate(n)
+
+                    for name, factory in ProfileDisjointSet.DisjointSetClasses.items():
+                        test_case = f"{name}_{distribution}"
+                        ds = ProfileDisjointSet.build(factory, elements)
+                        timings = [("merge", len(edges), ProfileDisjointSet.time_calls(ds.merge, edges))]
+                        depths = ProfileDisjointSet.forest_depths(ds)
+                        timings.append(("find_partition", len(finds), ProfileDisjointSet.time_calls(ds.find_partition, finds)))
+                        timings.append(("are_disjoint", len(checks), ProfileDisjointSet.time_calls(ds.are_disjoint, checks)))
+
+                        if hasattr(ds, "merge_many"):
+                            ds = ProfileDisjointSet.build(factory, elements)
+                            timings.append(("merge_many", len(edges), ProfileDisjointSet.time_calls(ds.merge_many, [(edges,)])))
+
+                        for method_name, calls, total_time in timings:
+                            heap_profile.ProfileHeap.write_row(f, test_case, n, method_name, total_time, total_time, total_time / calls)
+
+                        tracemalloc.start()
+                        ds = ProfileDisjointSet.build(factory, elements)
+                        for e1, e2 in edges:
+                            ds.merge(e1, e2)
+                        peak_bytes = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                        del ds
+
+                        f_shape.write(f'{test_case},{n},{peak_bytes},{max(depths)},{sum(depths) / len(depths)}\n')
+                        merge_time = timings[0][2]
+                        print(f"{test_case} with {n} elements: merge {merge_time / len(edges) * 1e6:.2f} us, "
+                              f"peak memory {peak_bytes / 2**20:.1f} MiB, max depth {max(depths)}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import tempfile
+import time
+import tracemalloc
+
+import random
+
+from datastructures.disjointsets import CompactDisjointSet
+from datastructures.edge_loader import EdgeLoadStats, load_edges, read_binary_edges, read_text_edges, write_binary_edges
+
+#Throughput and peak memory of loading an edge file into a CompactDisjointSet: parsing the whole text file into a list before
+#merging (the old way), against streaming the text file and the binary file in chunks with edge_loader.
+#The time is measured without tracemalloc, then every load is repeated under tracemalloc to get the peak memory.
+
+
+class ProfileEdgeLoader(unittest.TestCase):
+    Elements = 10**5
+    Edges = 10**6
+    OutputFileName = "data/stats_edge_loader.csv"
+
+
+    @staticmethod
+    def write_header(f) -> None:
+        """Write the header of the output csv file for stats"""
+        f.write('test_case,edges,total_time,edges_per_second,peak_bytes\n')
+
+
+    @staticmethod
+    def write_row(f, test_case: str, stats: EdgeLoadStats, peak_bytes: int) -> None:
+        """Add a row of data to the stats csv file"""
+        f.write(f'{test_case},{stats.edges},{stats.seconds},{stats.edges_per_second},{peak_bytes}\n')
+
+
+    @staticmethod
+    def load_list(path: str) -> EdgeLoadStats:
+        """Parse all the text file into a list of pairs, then merge them. The time includes the parsing."""
+        start = time.perf_counter()
+        with open(path) as text:
+            edges = [tuple(map(int, line.split(",")[:2])) for line in text]
+        chunk = [elem for edge in edges for elem in edge]
+        stats = load_edges(CompactDisjointSet(), [chunk])
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+
+    def test_load(self) -> None:
+        n = ProfileEdgeLoader.Elements
+        edges = [(random.randrange(n), random.randrange(n)) for _ in range(ProfileEdgeLoader.Edges)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            text_path = os.path.join(tmp, "edges.txt")
+            binary_path = os.path.join(tmp, "edges.bin")
+            with open(text_path, "w") as text:
+                text.writelines(f"{u},{v}\n" for u, v in edges)
+            write_binary_edges(binary_path, edges, "i")
+            del edges
+
+            #test_case -> function that loads the file and returns the stats.
+            loaders = {
+                "text_list": lambda: ProfileEdgeLoader.load_list(text_path),
+                "text_stream": lambda: load_edges(CompactDisjointSet(), read_text_edges(text_path)),
+                "binary_stream": lambda: load_edges(CompactDisjointSet(), read_binary_edges(binary_path, "i")),
+                "binary_stream_of_size": lambda: load_edges(CompactDisjointSet.of_size(n), read_binary_edges(binary_path, "i"), 
+                                                            add_elements=False),
+            }
+
+            with open(ProfileEdgeLoader.OutputFileName, "w") as f:
+                ProfileEdgeLoader.write_header(f)
+
+                for test_case, loader in loaders.items():
+                    stats = loader()
+                    tracemalloc.start()
+                    loader()
+                    peak_bytes = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                    ProfileEdgeLoader.write_row(f, test_case, stats, peak_bytes)
+                    print(f"{test_case}: {stats.edges_per_second:.0f} edges/s, peak memory {peak_bytes / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import time
+
+import random
+
+from datastructures.dheap import DHeap
+
+import heap_profile
+
+#Compare the specialised sift routines used by DHeap for 'min' and 'max' with the generic path that calls a comparator function
+#for every comparison. The timings are taken with perf_counter instead of cProfile, because the profiler overhead on every call
+#hides the difference. The output has the same format of heap_profile.py.
+
+
+class ProfileHeapComparator(unittest.TestCase):
+    BranchingFactors = heap_profile.ProfileHeap.BranchingFactors
+    Runs = 20000
+    OutputFileName = "data/stats_heap_comparator.csv"
+    #test_case -> comparator passed to DHeap.
+    Comparators = {"min": "min", "max": "max", "callable": lambda x, y: x < y}
+
+
+    @staticmethod
+    def time_operations(heap: DHeap, method_name: str, args: list[tuple]) -> float:
+        """Call heap.method_name on every tuple of arguments and return the elapsed time."""
+        method = getattr(heap, method_name)
+        start = time.perf_counter()
+        for a in args:
+            method(*a)
+        return time.perf_counter() - start
+
+
+    def test_comparators(self) -> None:
+        #test_case -> branching_factor -> method_name -> per call time
+        per_call: dict[str, dict[int, dict[str, float]]] = {}
+
+        with open(ProfileHeapComparator.OutputFileName, "w") as f:
+            heap_profile.ProfileHeap.write_header(f)
+
+            for b in ProfileHeapComparator.BranchingFactors:
+                n = ProfileHeapComparator.Runs
+                inserts = [(i, random.randint(0, 2000)) for i in range(n)]
+                updates = [(random.randrange(n), random.randint(0, 2000)) for _ in range(n // 10)]
+                tops = [() for _ in range(n)]
+
+                for test_case, comparator in ProfileHeapComparator.Comparators.items():
+                    heap = DHeap(b, comparator, indexed=True)
+                    timings = [("insert", len(inserts), ProfileHeapComparator.time_operations(heap, "insert", inserts)),
+                               ("update", len(updates), ProfileHeapComparator.time_operations(heap, "update", updates)),
+                               ("top", len(tops), ProfileHeapComparator.time_operations(heap, "top", tops))]
+
+                    for method_name, calls, total_time in timings:
+                        heap_profile.ProfileHeap.write_row(f, test_case, b, method_name, total_time, total_time, total_time / calls)
+                        per_call.setdefault(test_case, {}).setdefault(b, {})[method_name] = total_time / calls
+
+        print("\nSpeedup of the specialised routines over the comparator function:")
+        for b in ProfileHeapComparator.BranchingFactors:
+            baseline = per_call["callable"][b]
+            row = [f"{test_case} {method_name}: {baseline[method_name] / per_call[test_case][b][method_name]:.2f}x"
+                   for test_case in ("min", "max") for method_name in baseline]
+            print(f"branching factor {b}: " + ", ".join(row))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import random
+
+from datastructures.dheap import DHeap, ArrayDHeap
+
+#Memory used by the heap implementations (estimated with their memory_usage method, based on sys.getsizeof) when both the
+#elements and the priorities are ints.
+
+
+class ProfileHeapMemory(unittest.TestCase):
+    Sizes = [10**4, 10**5, 10**6]
+    OutputFileName = "data/stats_heap_memory.csv"
+    #test_case -> function that builds an heap from the elements and the priorities.
+    HeapFactories = {
+        "heap": lambda elements, priorities: DHeap(4, "min", elements, priorities),
+        "array_heap": lambda elements, priorities: ArrayDHeap(4, "min", elements, priorities),
+        "compact_heap": lambda elements, priorities: ArrayDHeap(4, "min", elements, priorities, element_typecode="q"),
+    }
+
+
+    @staticmethod
+    def write_header(f) -> None:
+        """Write the header of the output csv file for stats"""
+        f.write('test_case,size,bytes,bytes_per_entry\n')
+
+
+    @staticmethod
+    def write_row(f, test_case: str, size: int, total_bytes: int) -> None:
+        """Add a row of data to the stats csv file"""
+        f.write(f'{test_case},{size},{total_bytes},{total_bytes / size}\n')
+
+
+    def test_memory(self) -> None:
+        with open(ProfileHeapMemory.OutputFileName, "w") as f:
+            ProfileHeapMemory.write_header(f)
+
+            for n in ProfileHeapMemory.Sizes:
+                elements = list(range(n))
+                priorities = [random.randint(0, 10**9) for _ in range(n)]
+
+                for test_case, factory in ProfileHeapMemory.HeapFactories.items():
+                    heap = factory(elements, priorities)
+                    total_bytes = heap.memory_usage()
+                    ProfileHeapMemory.write_row(f, test_case, n, total_bytes)
+                    print(f"{test_case} with {n} entries: {total_bytes / n:.1f} bytes per entry")
+
+
+if __name__ == "__main__":
+    unittest.main()
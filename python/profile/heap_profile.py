@@ -4,7 +4,7 @@ import pstats
 
 import random
 
-from datastructures.dheap import DHeap
+from datastructures.dheap import DHeap, ArrayDHeap
 
 #Some of the functions are taken from: 
 # https://github.com/mlarocca/AlgorithmsAndDataStructuresInAction/blob/master/Python/mlarocca/tests/heap_profile.py
@@ -18,6 +18,8 @@ class ProfileHeap(unittest.TestCase):
     Runs = 5000
     OutputFileName = "data/stats_heap.csv"
     OutputFileNameHeapify = "data/stats_heapify.csv"
+    #Every heap implementation is profiled with the same workload; the name is written in the test_case column.
+    HeapClasses = {"heap": DHeap, "array_heap": ArrayDHeap}
 
 
     @staticmethod
@@ -52,25 +54,26 @@ class ProfileHeap(unittest.TestCase):
         with open(ProfileHeap.OutputFileName, "w") as f:
             ProfileHeap.write_header(f)
 
-            for b in ProfileHeap.BranchingFactors:
-                heap = DHeap(b)
-                
-                for _ in range(ProfileHeap.Runs):
-                    profiler = cProfile.Profile()
-                    profiler.runcall(heap.insert, random.random(), random.randint(0, 2000))
-                    st = pstats.Stats(profiler)
-
-                    for method_name, total_time, cumulative_time, per_call_time in ProfileHeap.get_running_times(st, "insert"):
-                        ProfileHeap.write_row(f, "heap", b, method_name, total_time, cumulative_time, per_call_time)
+            for test_case, heap_class in ProfileHeap.HeapClasses.items():
+                for b in ProfileHeap.BranchingFactors:
+                    heap = heap_class(b)
                     
-                     
-                while not heap.empty():
-                    profiler = cProfile.Profile()
-                    profiler.runcall(heap.top)
-                    st = pstats.Stats(profiler)
-
-                    for method_name, total_time, cumulative_time, per_call_time in ProfileHeap.get_running_times(st, "top"):
-                        ProfileHeap.write_row(f, "heap", b, method_name, total_time, cumulative_time, per_call_time)
+                    for _ in range(ProfileHeap.Runs):
+                        profiler = cProfile.Profile()
+                        profiler.runcall(heap.insert, random.random(), random.randint(0, 2000))
+                        st = pstats.Stats(profiler)
+
+                        for method_name, total_time, cumulative_time, per_call_time in ProfileHeap.get_running_times(st, "insert"):
+                            ProfileHeap.write_row(f, test_case, b, method_name, total_time, cumulative_time, per_call_time)
+                        
+                         
+                    while not heap.empty():
+                        profiler = cProfile.Profile()
+                        profiler.runcall(heap.top)
+                        st = pstats.Stats(profiler)
+
+                        for method_name, total_time, cumulative_time, per_call_time in ProfileHeap.get_running_times(st, "top"):
+                            ProfileHeap.write_row(f, test_case, b, method_name, total_time, cumulative_time, per_call_time)
 
                     
 
@@ -79,19 +82,20 @@ class ProfileHeap(unittest.TestCase):
         with open(ProfileHeap.OutputFileNameHeapify, "w") as f:
             ProfileHeap.write_header(f)
             
-            for b in ProfileHeap.BranchingFactors:
-                for _ in range(ProfileHeap.Runs):
-                    n = 1000 + random.randint(0, 1000)
-                    elements = [random.random() for i in range(n)]
-                    priorities = [random.randint(0, 2000) for i in range(n)]
-                    
-                    profiler = cProfile.Profile()
-                    profiler.runcall(DHeap, b, "max", elements, priorities)
-
-                    st = pstats.Stats(profiler)
-                    
-                    for method_name, total_time, cumulative_time, per_call_time in ProfileHeap.get_running_times(st, "_heapify"):
-                        ProfileHeap.write_row(f, "heap", b, method_name, total_time, cumulative_time, per_call_time)
+            for test_case, heap_class in ProfileHeap.HeapClasses.items():
+                for b in ProfileHeap.BranchingFactors:
+                    for _ in range(ProfileHeap.Runs):
+                        n = 1000 + random.randint(0, 1000)
+                        elements = [random.random() for i in range(n)]
+                        priorities = [random.randint(0, 2000) for i in range(n)]
+                        
+                        profiler = cProfile.Profile()
+                        profiler.runcall(heap_class, b, "max", elements, priorities)
+
+                        st = pstats.Stats(profiler)
+                        
+                        for method_name, total_time, cumulative_time, per_call_time in ProfileHeap.get_running_times(st, "_heapify"):
+                            ProfileHeap.write_row(f, test_case, b, method_name, total_time, cumulative_time, per_call_time)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+import unittest
+import time
+
+import random
+
+from datastructures.disjointsets import CompactDisjointSet
+from datastructures.parallel_disjointsets import parallel_merge_many
+
+#Ingestion time of a random edge stream: serial (a single CompactDisjointSet.merge_many) against parallel_merge_many with 
+#1, 2, 4 and 8 worker processes. The speedup depends on the number of cpus and on how much the shards shrink: the forest 
+#returned by a worker has one pair per distinct element of its shard, so the pool pays off when the edges are many more than 
+#the elements.
+
+
+class ProfileParallelDisjointSet(unittest.TestCase):
+    Workers = [1, 2, 4, 8]
+    Elements = 10**5
+    Edges = 2 * 10**6
+    ShardSize = 100000
+    OutputFileName = "data/stats_parallel_disjointset.csv"
+
+
+    @staticmethod
+    def write_header(f) -> None:
+        """Write the header of the output csv file for stats"""
+        f.write('test_case,workers,edges,total_time,edges_per_second\n')
+
+
+    @staticmethod
+    def write_row(f, test_case: str, workers: int, edges: int, total_time: float) -> None:
+        """Add a row of data to the stats csv file"""
+        f.write(f'{test_case},{workers},{edges},{total_time},{edges / total_time}\n')
+
+
+    @staticmethod
+    def serial(edges: list[tuple[int, int]]) -> CompactDisjointSet:
+        ds = CompactDisjointSet.of_size(ProfileParallelDisjointSet.Elements)
+        ds.merge_many(edges)
+        return ds
+
+
+    def test_ingestion(self) -> None:
+        n = ProfileParallelDisjointSet.Elements
+        edges = [(random.randrange(n), random.randrange(n)) for _ in range(ProfileParallelDisjointSet.Edges)]
+
+        with open(ProfileParallelDisjointSet.OutputFileName, "w") as f:
+            ProfileParallelDisjointSet.write_header(f)
+
+            start = time.perf_counter()
+            expected = ProfileParallelDisjointSet.serial(edges)
+            total_time = time.perf_counter() - start
+            ProfileParallelDisjointSet.write_row(f, "serial", 1, len(edges), total_time)
+            print(f"serial: {len(edges) / total_time:.0f} edges/s")
+
+            for workers in ProfileParallelDisjointSet.Workers:
+                start = time.perf_counter()
+                ds = parallel_merge_many(edges, workers, ProfileParallelDisjointSet.ShardSize)
+                total_time = time.perf_counter() - start
+                ProfileParallelDisjointSet.write_row(f, "parallel", workers, len(edges), total_time)
+                print(f"parallel with {workers} workers: {len(edges) / total_time:.0f} edges/s")
+
+                self.assertEqual(len(set(ds.labels())), len(set(expected.labels())))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import time
+
+import random
+
+from datastructures.treap import ImplicitTreap
+
+import heap_profile
+
+#Compare ImplicitTreap with a Python list on positional edits of a long sequence: insert and delete at random positions and 
+#reverse of random ranges. The list moves the elements after the position (memmove, very fast but O(N)), the treap does
+#O(log(N)) splits and joins. The output has the same format of heap_profile.py, with the length of the sequence in the 
+#branching_factor column.
+
+
+class ProfileRope(unittest.TestCase):
+    Sizes = [10**4, 10**5, 10**6]
+    Runs = 2000
+    OutputFileName = "data/stats_rope.csv"
+
+
+    @staticmethod
+    def list_reverse(sequence: list, i: int, j: int) -> None:
+        sequence[i:j] = sequence[i:j][::-1]
+
+
+    @staticmethod
+    def time_calls(method, args: list[tuple]) -> float:
+        """Call method on every tuple of arguments and return the elapsed time."""
+        start = time.perf_counter()
+        for a in args:
+            method(*a)
+        return time.perf_counter() - start
+
+
+    def test_positional_edits(self) -> None:
+        with open(ProfileRope.OutputFileName, "w") as f:
+            heap_profile.ProfileHeap.write_header(f)
+
+            for n in ProfileRope.Sizes:
+                inserts = [(random.randrange(n), i) for i in range(ProfileRope.Runs)]
+                deletes = [(random.randrange(n),) for _ in range(ProfileRope.Runs)]
+                reverses = [tuple(sorted((random.randrange(n), random.randrange(n)))) for _ in range(ProfileRope.Runs)]
+
+                sequence = list(range(n))
+                rope = ImplicitTreap(range(n))
+                timings = [("list", "insert_at", ProfileRope.time_calls(sequence.insert, inserts)),
+                           ("list", "delete_at", ProfileRope.time_calls(sequence.pop, deletes)),
+                           ("list", "reverse", ProfileRope.time_calls(lambda i, j: ProfileRope.list_reverse(sequence, i, j), reverses)),
+                           ("implicit_treap", "insert_at", ProfileRope.time_calls(rope.insert_at, inserts)),
+                           ("implicit_treap", "delete_at", ProfileRope.time_calls(rope.delete_at, deletes)),
+                           ("implicit_treap", "reverse", ProfileRope.time_calls(rope.reverse, reverses))]
+                self.assertEqual(list(rope), sequence)
+
+                for test_case, method_name, total_time in timings:
+                    heap_profile.ProfileHeap.write_row(f, test_case, n, method_name, total_time, total_time, total_time / ProfileRope.Runs)
+                    print(f"{test_case} of {n} values, {method_name}: {total_time / ProfileRope.Runs * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import time
+import tracemalloc
+
+import random
+
+from datastructures.treap import Treap
+
+import heap_profile
+
+#Memory and latency of Treap. The memory is the size of the nodes of a treap built with from_sorted, measured with tracemalloc
+#(the keys and the priorities are allocated before). The latencies are taken with perf_counter on a treap of each size and
+#written in the same format of heap_profile.py, with the size of the treap in the branching_factor column.
+
+
+class ProfileTreap(unittest.TestCase):
+    Sizes = [10**4, 10**5, 10**6]
+    Runs = 100000
+    OutputFileName = "data/stats_treap.csv"
+    OutputFileNameMemory = "data/stats_treap_memory.csv"
+
+
+    @staticmethod
+    def time_calls(method, args: list[tuple]) -> float:
+        """Call method on every tuple of arguments and return the elapsed time."""
+        start = time.perf_counter()
+        for a in args:
+            method(*a)
+        return time.perf_counter() - start
+
+
+    def test_memory(self) -> None:
+        with open(ProfileTreap.OutputFileNameMemory, "w") as f:
+            f.write('test_case,size,bytes,bytes_per_entry\n')
+
+            for n in ProfileTreap.Sizes:
+                keys = list(range(n))
+                priorities = [random.random() for _ in range(n)]
+
+                tracemalloc.start()
+                treap = Treap.from_sorted(keys, priorities)
+                total_bytes = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+                del treap
+
+                f.write(f'treap,{n},{total_bytes},{total_bytes / n}\n')
+                print(f"treap with {n} keys: {total_bytes / n:.1f} bytes per node")
+
+
+    def test_latency(self) -> None:
+        with open(ProfileTreap.OutputFileName, "w") as f:
+            heap_profile.ProfileHeap.write_header(f)
+
+            for n in ProfileTreap.Sizes:
+                keys = list(range(0, 2 * n, 2))
+                treap = Treap.from_sorted(keys, [random.random() for _ in range(n)])
+                searches = [(random.randrange(2 * n),) for _ in range(ProfileTreap.Runs)]
+                #Odd keys, so they are not already in the treap and the removes find the inserted keys.
+                inserts = [(2 * random.randrange(n) + 1, random.random()) for _ in range(ProfileTreap.Runs)]
+                removes = [(key,) for key, _ in inserts]
+
+                timings = [("contains", ProfileTreap.time_calls(treap.contains, searches)),
+                           ("insert", ProfileTreap.time_calls(treap.insert, inserts)),
+                           ("remove", ProfileTreap.time_calls(treap.remove, removes))]
+
+                for method_name, total_time in timings:
+                    heap_profile.ProfileHeap.write_row(f, "treap", n, method_name, total_time, total_time, total_time / ProfileTreap.Runs)
+                    print(f"treap with {n} keys, {method_name}: {total_time / ProfileTreap.Runs * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    unittest.main()